@@ -16,7 +16,9 @@ from app.db.database import get_users_collection
 from app.models.schemas import Token, UserCreate
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address, storage_uri=settings.RATE_LIMIT_STORAGE_URI
+)
 
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
@@ -1,35 +1,155 @@
+import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List
-
-import google.generativeai as genai
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Dict, List, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+)
 from fastapi.responses import StreamingResponse
 from google.api_core import exceptions
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.core.config import require_gemini_key
-from app.core.security import get_current_user
-from app.db.database import get_chat_collection
-from app.models.schemas import ChatRequest, User
-from app.services.scraper_service import get_problem_data
+from app.core.config import settings
+from app.core.security import get_current_user, get_optional_user
+from app.db.database import get_chat_collection, get_code_snapshots_collection
+from app.models.schemas import ChatRequest, HintRequest, ProblemBatchRequest, User
+from app.services.archiver import expand_turns
+from app.services.code_analysis import (
+    analyze_code,
+    format_findings,
+    input_size_bound,
+    syntax_error_reply,
+)
+from app.services.code_snapshots import code_version, resolve_code
+from app.services.export import encode_ndjson, iter_export_records, parse_cursor
+from app.services.hints import (
+    HINT_QUESTION,
+    is_hint_request,
+    next_hint,
+    official_hints,
+)
+from app.services.llm import get_provider
+from app.services.pregeneration import opening_turns, pregenerate_opening_turn, turn_key
+from app.services.prompts import (
+    build_light_context,
+    build_light_turn_prompt,
+    build_problem_context,
+    build_turn_prompt,
+    context_key,
+)
+from app.services.routing import classify_turn, record_route, tier_config
+from app.services.scraper_service import (
+    get_problem_data,
+    problem_key,
+    related_index,
+    stream_problem_batch,
+)
+from app.services.search import search_history
+from app.services.shared_cache import SharedCache
+from app.services.single_flight import Flight, chat_flights, flight_key
+from app.services.streaming import (
+    BroadcastStream,
+    coalesce,
+    iterate_in_thread,
+    wait_for_disconnect,
+)
+
+# Turns of history that go into the /chat prompt
+HISTORY_WINDOW = 5
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address, storage_uri=settings.RATE_LIMIT_STORAGE_URI
+)
+summary_cache = SharedCache(
+    "problem-summaries",
+    ttl_seconds=settings.PROBLEM_CACHE_TTL_SECONDS,
+    max_bytes=4 * 1024 * 1024,
+)
 
 
 # --- Helpers ---
 def get_user_chat_history(username: str, conversation_id: str) -> List[Dict[str, str]]:
     chat_collection = get_chat_collection()
-    history = list(
-        chat_collection.find(
+    docs = chat_collection.find(
+        {"user_id": username, "conversation_id": conversation_id},
+        {"_id": 0, "question": 1, "response": 1, "archived": 1, "archive": 1},
+    ).sort("timestamp", 1)
+    # Archived conversations are stored as one compressed document
+    history = [
+        {"question": turn["question"], "response": turn["response"]}
+        for doc in docs
+        for turn in expand_turns(doc)
+    ]
+    return history
+
+
+def get_recent_chat_history(
+    username: str, conversation_id: str
+) -> List[Dict[str, str]]:
+    """Last HISTORY_WINDOW turns, read in one query for the newest documents."""
+    docs = (
+        get_chat_collection()
+        .find(
             {"user_id": username, "conversation_id": conversation_id},
-            {"_id": 0, "question": 1, "response": 1},
+            {"_id": 0, "question": 1, "response": 1, "archived": 1, "archive": 1},
         )
+        .sort("timestamp", -1)
+        .limit(HISTORY_WINDOW)
     )
-    return history
+    return [
+        {"question": turn["question"], "response": turn["response"]}
+        for doc in reversed(list(docs))
+        for turn in expand_turns(doc)
+    ][-HISTORY_WINDOW:]
+
+
+def save_chat_turn(
+    username: str,
+    chat_request: ChatRequest,
+    response: str,
+    hint_level: Optional[int] = None,
+    truncated: bool = False,
+):
+    turn = {
+        "user_id": username,
+        "question": chat_request.question,
+        "conversation_id": chat_request.conversation_id,
+        "problem_slug": chat_request.problem_slug,
+        "response": response,
+        "timestamp": datetime.now().isoformat(),
+    }
+    if hint_level is not None:
+        # Official hint served without the model; drives the hint ladder
+        turn["hint_level"] = hint_level
+    if truncated:
+        # The student left before the answer finished streaming
+        turn["truncated"] = True
+    try:
+        chat_collection = get_chat_collection()
+        chat_collection.insert_one(turn)
+    except Exception as e:
+        logging.error(f"MongoDB insert error after stream: {e}")
+
+
+def answer_locally(
+    username: str,
+    chat_request: ChatRequest,
+    response: str,
+    headers: Dict[str, str],
+    **turn_fields,
+) -> StreamingResponse:
+    """Saves and returns a turn answered without calling the model."""
+    save_chat_turn(username, chat_request, response, **turn_fields)
+    return StreamingResponse(iter([response]), media_type="text/plain", headers=headers)
 
 
 # --- Routes ---
@@ -37,13 +157,83 @@ def get_user_chat_history(username: str, conversation_id: str) -> List[Dict[str,
 
 @router.get("/fetch-problem/{problem_identifier:path}")
 @limiter.limit("30/minute")
-def fetch_problem(request: Request, problem_identifier: str):
-    return get_problem_data(problem_identifier)
+def fetch_problem(
+    request: Request,
+    problem_identifier: str,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    problem_data = get_problem_data(problem_identifier)
+    # The frontend's auto-start asks the opening question right after this.
+    # Only signed-in callers can go on to chat, so only they may spend a
+    # model call on it.
+    if settings.PREGENERATE_OPENING_TURN and current_user is not None:
+        background_tasks.add_task(pregenerate_opening_turn, problem_data)
+    return problem_data
+
+
+@router.post("/fetch-problems")
+@limiter.limit("5/minute")
+async def fetch_problems(request: Request, batch: ProblemBatchRequest):
+    return StreamingResponse(
+        stream_problem_batch(batch.identifiers, settings.BATCH_FETCH_CONCURRENCY),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/hint")
+@limiter.limit("30/minute")
+def get_next_hint(
+    request: Request,
+    hint_request: HintRequest,
+    current_user: User = Depends(get_current_user),
+):
+    """Serves the next official hint; ``hint`` is null once they run out."""
+    problem_data = get_problem_data(hint_request.problem_slug)
+    try:
+        hint = next_hint(
+            current_user.username, hint_request.conversation_id, problem_data
+        )
+    except Exception as e:
+        logging.error(f"Error fetching hint level: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch hint")
+
+    if hint is None:
+        return {
+            "level": None,
+            "total": len(official_hints(problem_data)),
+            "hint": None,
+        }
+
+    if not hint["repeat"]:
+        chat_request = ChatRequest(
+            question=HINT_QUESTION,
+            problem_slug=hint_request.problem_slug,
+            conversation_id=hint_request.conversation_id,
+        )
+        save_chat_turn(
+            current_user.username, chat_request, hint["response"], hint["level"]
+        )
+    return {"level": hint["level"], "total": hint["total"], "hint": hint["hint"]}
+
+
+@router.get("/related/{problem_identifier:path}")
+@limiter.limit("30/minute")
+def related_problems(
+    request: Request, problem_identifier: str, k: int = Query(5, ge=1, le=20)
+):
+    get_problem_data(problem_identifier)
+    key = problem_key(problem_identifier)
+    return {"problem": key, "related": related_index.related(key, k)}
 
 
 @router.get("/fetch-problem-summary/{problem_identifier:path}")
 @limiter.limit("30/minute")
 def fetch_problem_summary(request: Request, problem_identifier: str):
+    cached = summary_cache.get(problem_identifier)
+    if cached is not None:
+        return cached
+
     try:
         problem_data = get_problem_data(problem_identifier)
         # Extract description and examples (if present)
@@ -55,7 +245,9 @@ def fetch_problem_summary(request: Request, problem_identifier: str):
             examples = examples_str.split("Example")
             examples = [ex.strip() for ex in examples if ex.strip()]
 
-        return {"description": description, "examples": examples}
+        summary = {"description": description, "examples": examples}
+        summary_cache.set(problem_identifier, summary)
+        return summary
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -68,164 +260,133 @@ async def chat(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        # Initialize Gemini and validate key
-        api_key = require_gemini_key()
-        genai.configure(api_key=api_key)
+        # Initialize the model provider (validates the Gemini key)
+        provider = get_provider()
 
         logging.info(
             f"Received chat request from {current_user.username} for problem: {chat_request.problem_slug}"
         )
 
+        # Attach to an identical submission that is still streaming (double
+        # clicks, client retries) before anything below touches the
+        # conversation's state.
+        key = flight_key(
+            current_user.username,
+            chat_request.conversation_id,
+            chat_request.model_dump_json(),
+        )
+        flight = chat_flights.join(key)
+        if flight is not None:
+            return stream_flight(request, flight)
+
         # 1. Fetch problem data
         problem_data = get_problem_data(chat_request.problem_slug)
 
+        # Resolve the editor contents (full code or a patch on the last snapshot)
+        code, previous_code = resolve_code(current_user.username, chat_request)
+        headers = {"X-Code-Version": code_version(code)} if code is not None else {}
+
+        # Plain hint requests climb the official hint ladder without the model
+        if is_hint_request(chat_request.question):
+            try:
+                hint = next_hint(
+                    current_user.username, chat_request.conversation_id, problem_data
+                )
+            except Exception as e:
+                logging.error(f"MongoDB hint level fetch error: {e}")
+                hint = None
+            if hint is not None and hint["repeat"]:
+                return StreamingResponse(
+                    iter([hint["response"]]), media_type="text/plain", headers=headers
+                )
+            if hint is not None:
+                return answer_locally(
+                    current_user.username,
+                    chat_request,
+                    hint["response"],
+                    headers,
+                    hint_level=hint["level"],
+                )
+
+        # Local analysis of the editor; a "why doesn't this run?" on code that
+        # does not parse is answered right here.
+        size_bound = input_size_bound(problem_data.get("description", ""))
+        findings = analyze_code(code, size_bound, settings.CODE_ANALYSIS_BUDGET_MS)
+        reply = syntax_error_reply(chat_request.question, code, findings)
+        if reply is not None:
+            return answer_locally(current_user.username, chat_request, reply, headers)
+
         # 2. Build Chat History Context
         try:
-            history = get_user_chat_history(
+            history = get_recent_chat_history(
                 current_user.username, chat_request.conversation_id
             )
-            history_context = json.dumps(history[-5:], indent=2)
+            history_context = json.dumps(history, indent=2)
         except Exception as e:
             logging.error(f"MongoDB history fetch error: {e}")
+            history = []
             history_context = "[]"
 
-        # 3. Construct Prompt
-        prompt = f"""
-You are an expert AI-powered Data Structures and Algorithms (DSA) tutor. Your mission is to **guide the user** step-by-step in solving the problem '{problem_data["title"]}' from {problem_data["platform"]}. You are designed to be patient, encouraging, and focused on long-term learning.
-
----
-### **Problem Details**
-* **Platform:** {problem_data["platform"]}
-* **Difficulty:** {problem_data["difficulty"]}
-* **Tags:** {", ".join(problem_data["tags"])}
-* **Description:** {problem_data["description"]}
-
-
----
-### **User's Current Question & Context**
-**User asked:** {chat_request.question}
-
-**Conversation So Far:**
-{history_context}
-
-**User's Current Code (if any):**
-```python
-{chat_request.code if chat_request.code else "No code provided yet."}
-```
-
-
----
-### **Teaching Principles - How You Should Guide the User**
-
-1.  **Progressive Problem Decomposition:**  Break down the problem into smaller, logical steps. Start with high-level strategy and progressively delve into implementation details.  **Crucially, move forward to the next step after the user demonstrates understanding, avoid repeating questions on the same point.**
-
-2.  **Adaptive Hinting Strategy:**  If the user is stuck or explicitly asks for help, provide hints in increasing levels of detail:
-    *   **Level 1: Vague Hint (Directional):** Offer a general direction or related concept.
-    *   **Level 2: Medium Hint (Approach Suggestion):** Suggest a specific algorithm or data structure. 
-    *   **Level 3: Specific Hint (Implementation Nudge):**  Provide a more concrete step or a crucial detail.
-    *   **Only proceed to the next hint level if the user remains stuck after the previous hint.** Encourage the user to try solving with each hint before giving more.
-
-3.  **Evaluate User Approaches & Code Constructively:** If the user provides their own approach or code:
-    *   **First, acknowledge their effort and what's good about their attempt.**
-    *   **Then, provide specific, actionable feedback:**  Point out areas for improvement, potential bugs, efficiency concerns, or better alternatives.
-    *   **Suggest optimizations and alternative strategies.** Focus on learning and code quality, not just getting to a correct solution quickly.
-
-4.  **Iterative Code Snippets - Not Full Solutions:** Provide code snippets to illustrate specific concepts or steps, **but avoid giving complete solutions upfront unless absolutely necessary.** When providing snippets, always explain the code's purpose and logic clearly.
-
-5.  **Guiding Questions for Active Learning:**  End each response with a thoughtful question that prompts the user to think critically and actively engage with the problem-solving process.
-
----
-### **Handling "Edge Queries" and User States**
-
-6.  **Address "I Don't Know" or User Frustration:** If the user expresses confusion or says "I don't know":
-    *   **Acknowledge their difficulty and offer encouragement.** 
-    *   **Rephrase your previous question in a simpler way.**
-    *   **Break down the problem into even smaller sub-problems.**
-    *   **Offer to revisit foundational concepts** if needed.
-
-7.  **Clarify Ambiguous Questions:** If the user's question is unclear, ask clarifying questions to understand their intent before responding.
-
-8.  **Handle Unrelated Questions (DSA Concepts):** If the user asks about a DSA concept not directly related to the current problem (e.g., "What is Big O?"):
-    *   **Briefly address their question clearly and concisely.**
-    *   **Then, gently guide them back to the problem** to maintain focus.
-
-9.  **Code Generation Policy (Be Conservative):**  **Do not provide full solution code directly unless the user explicitly requests it after multiple attempts.** Prioritize guiding them to write the code themselves.
-
-10. **Handle Unrelated Code:** If the code in the "User's Current Code" section is completely unrelated to the problem statement (e.g., boilerplate code for a different problem, random text, or unrelated functions), ignore it for the purpose of solving the current problem. You may gently point out that their current code doesn't seem to match the problem if they ask you to review it, and then redirect them back to the problem at hand.
-
-11. **Handle Empty Code:** If the "User's Current Code" section clearly states "No code provided yet.", do not assume they have written anything. Ask them to think about how they might start, or provide the first conceptual step before asking for code.
-
-12. **Focus Priority (Query vs Code):** If the user asks a specific question (e.g. "What is the time complexity?"), prioritize answering their direct question over critiquing their code, unless their code is fundamentally broken in a way that prevents answering the question. If they don't ask a specific question (e.g. "Am I on the right track?"), focus your critique on the provided code. Do not ignore their explicit questions just because they have code in the editor.
-
-13. **Pseudocode is Welcome:** Explicitly recognize and encourage pseudocode. If the user writes pseudocode or logical steps instead of syntactically perfect code, evaluate their logic and guide them toward translating it into actual syntax.
-
-14. **The "Confident but Wrong" User:** If the user states they are finished or their code looks completely correct to them, but it fails on common hidden edge cases (e.g., empty arrays, negative numbers, integer overflow, strings with spaces), DO NOT just say "you're wrong" or provide the exact failing input immediately. Instead, guide them to discover it: "Your logic looks solid for standard inputs. Have you considered what happens if the input array is empty?"
-
-15. **Infinite Loops & Fatal Inefficiencies:** If the user writes code that will clearly result in an infinite loop or a foreseeable Time Limit Exceeded (TLE) error (e.g., an O(N^2) solution on a 10^5 constraint), proactively point out the performance bottleneck or loop condition flaw rather than just checking for logical correctness on small inputs. Suggest they trace the loop or consider the constraints.
-
-16. **Syntax Errors vs. Logical Errors:** If the user's code has a glaring syntax error (e.g., missing colon, wrong indentation, undefined variable), explicitly separate your feedback. First, point out the syntax error so they can get the code running. Then, if possible, address their logical approach separately. This prevents them from confusing a compilation error with a flawed algorithm.
-
-17. **Premature Optimization:** If the user attempts a highly optimized, complex solution before getting a basic, brute-force approach working and gets stuck, encourage them to step back. Suggest getting a naive, functional solution working first before worrying about optimizing for time or space complexity.
-
-18. **Keep it Concise:** Users lose interest in long walls of text. Keep your responses short and punchy. Aim for no more than 2-3 short paragraphs per turn. If a topic requires more explanation, ask the user if they'd like you to go deeper before writing a long response.
-
-19. **Use Rich Formatting:** Make your responses highly scannable and easy to read. Use **bolding** for important terms or concepts, use bullet points for lists of steps, and always use Markdown code blocks for code snippets or specific variable names.
-
-20. **Topic Switching:** If the user explicitly asks how to solve a completely different LeetCode problem (e.g., they are in a session for "Two Sum" but ask about "Reverse Linked List"), gently inform them that this current chat session is dedicated to the current problem ({problem_data.get("title", "the current problem")}). Politely ask them to create a **new chat session** from the dashboard using the new problem's slug to get the best, targeted help without mixing context.
-
----
-Now, respond accordingly and continue guiding the user from where the conversation left off, keeping these teaching principles and edge case handling strategies in mind.
-"""
-
-        # 4. Generate Content with Gemini (STREAMING)
-        model = genai.GenerativeModel(
-            "gemini-2.5-flash-lite",
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.0,  # Deterministic output
-                candidate_count=1,
-            ),
-        )
-
-        async def response_generator():
-            full_response = ""
-            try:
-                # Use stream=True for streaming
-                responses = model.generate_content(prompt, stream=True)
-                for chunk in responses:
-                    try:
-                        if chunk.text:
-                            full_response += chunk.text
-                            yield chunk.text
-                    except ValueError:
-                        pass
-
-                # After streaming is complete, save to DB
-                try:
-                    chat_collection = get_chat_collection()
-                    chat_collection.insert_one(
-                        {
-                            "user_id": current_user.username,
-                            "question": chat_request.question,
-                            "conversation_id": chat_request.conversation_id,
-                            "problem_slug": chat_request.problem_slug,
-                            "response": full_response,
-                            "timestamp": datetime.now().isoformat(),
-                        }
+        # 3. Route the turn to a model tier, then construct its prompt. The full
+        # problem context is shared by every student on this problem and cached
+        # upstream; only the turn prompt varies. Small talk gets a short,
+        # uncached prompt instead.
+        route = classify_turn(chat_request.question, code, history, findings)
+        tier = tier_config(route.tier)
+        model_name = tier["model"]
+        if tier["prompt"] == "light":
+            problem_context = build_light_context(problem_data)
+            turn_prompt = build_light_turn_prompt(
+                chat_request.question, history[-1] if history else None
+            )
+            cache_key = None
+        else:
+            problem_context = build_problem_context(problem_data)
+            turn_prompt = build_turn_prompt(
+                chat_request.question,
+                history_context,
+                code,
+                previous_code,
+                format_findings(findings, size_bound),
+            )
+            cache_key = context_key(problem_context)
+        record_route(route, len(problem_context) + len(turn_prompt))
+
+        # 4. Stream from a pre-generated opening turn if /fetch-problem started
+        # one for exactly this prompt, or from the model.
+        stream = opening_turns.claim(turn_key(problem_context, turn_prompt, model_name))
+        if stream is None:
+            stream = BroadcastStream(
+                iterate_in_thread(
+                    provider.stream(
+                        cache_key,
+                        problem_context,
+                        turn_prompt,
+                        model_name,
+                        tier["generation"],
                     )
-                except Exception as e:
-                    logging.error(f"MongoDB insert error after stream: {e}")
+                )
+            )
 
-            except Exception as e:
-                error_msg = str(e)
-                logging.error(f"Error during streaming: {error_msg}")
-                if "429" in error_msg or "quota" in error_msg.lower():
-                    friendly_error = "**Whoa, slow down!** 🚦 The AI teaching assistant is currently receiving too many requests. Please wait a few seconds and try sending your message again."
-                    yield friendly_error
-                else:
-                    yield f"An unexpected error occurred: {error_msg}"
+        def persist(flight: Flight):
+            stream = flight.stream
+            if stream.cancelled:
+                # Every client left mid-answer; keep what was generated
+                if stream.text:
+                    save_chat_turn(
+                        current_user.username,
+                        chat_request,
+                        stream.text,
+                        truncated=True,
+                    )
+            elif not stream.failed:
+                save_chat_turn(current_user.username, chat_request, stream.text)
 
-        return StreamingResponse(response_generator(), media_type="text/plain")
+        flight = chat_flights.start(key, stream, persist, headers)
+        return stream_flight(request, flight)
 
+    except HTTPException:
+        raise
     except exceptions.ResourceExhausted as e:
         logging.error(f"Gemini Rate Limit hit: {e}")
         raise HTTPException(status_code=429, detail="Too many requests.")
@@ -234,6 +395,51 @@ Now, respond accordingly and continue guiding the user from where the conversati
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def stream_flight(request: Request, flight: Flight) -> StreamingResponse:
+    """Streams ``flight`` to one client, leaving it once that client is gone."""
+    left = False
+
+    def leave():
+        nonlocal left
+        if not left:
+            left = True
+            chat_flights.leave(flight)
+
+    async def response_generator():
+        # Starlette only notices a disconnect when it next sends, which may
+        # be a long way off while the model is thinking; watch for it here.
+        watcher = asyncio.create_task(wait_for_disconnect(request.receive))
+        watcher.add_done_callback(lambda task: task.cancelled() or leave())
+        try:
+            frames = coalesce(
+                flight.stream.subscribe(),
+                flush_chars=settings.STREAM_FLUSH_CHARS,
+                max_delay=settings.STREAM_FLUSH_MAX_DELAY_MS / 1000,
+            )
+            async for frame in frames:
+                yield frame
+
+            # The turn is saved once the generation completes; wait for it
+            # so the next turn sees this one in its history.
+            await asyncio.shield(flight.completion)
+
+        except Exception as e:
+            error_msg = str(e)
+            logging.error(f"Error during streaming: {error_msg}")
+            if "429" in error_msg or "quota" in error_msg.lower():
+                friendly_error = "**Whoa, slow down!** 🚦 The AI teaching assistant is currently receiving too many requests. Please wait a few seconds and try sending your message again."
+                yield friendly_error
+            else:
+                yield f"An unexpected error occurred: {error_msg}"
+        finally:
+            watcher.cancel()
+            leave()
+
+    return StreamingResponse(
+        response_generator(), media_type="text/plain", headers=flight.headers
+    )
+
+
 @router.get("/history/{conversation_id}")
 def fetch_history(
     conversation_id: str, current_user: User = Depends(get_current_user)
@@ -292,6 +498,44 @@ def get_conversations(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Failed to fetch conversations")
 
 
+@router.get("/search")
+def search_conversations(
+    q: str = Query(..., min_length=1, max_length=200),
+    problem_slug: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        return search_history(current_user.username, q, problem_slug, page, page_size)
+    except Exception as e:
+        logging.error(f"Error searching history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search history")
+
+
+@router.get("/export")
+@limiter.limit("5/minute")
+def export_conversations(
+    request: Request,
+    conversation_id: Optional[List[str]] = Query(None),
+    after: Optional[str] = None,
+    gzip: bool = False,
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        parse_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    records = iter_export_records([current_user.username], conversation_id, after)
+    filename = "conversations.ndjson.gz" if gzip else "conversations.ndjson"
+    return StreamingResponse(
+        encode_ndjson(records, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.patch("/history/{conversation_id}")
 def rename_conversation(
     conversation_id: str,
@@ -324,6 +568,9 @@ def delete_conversation(
     result = chat_collection.delete_many(
         {"conversation_id": conversation_id, "user_id": current_user.username}
     )
+    get_code_snapshots_collection().delete_one(
+        {"conversation_id": conversation_id, "user_id": current_user.username}
+    )
     if result.deleted_count == 0:
         return {"message": "Conversation deleted or not found"}
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -22,6 +23,115 @@ class Settings:
     def SECRET_KEY(self):
         return os.getenv("SECRET_KEY")
 
+    @property
+    def WEB_CONCURRENCY(self):
+        return int(os.getenv("WEB_CONCURRENCY", "1"))
+
+    @property
+    def PORT(self):
+        return int(os.getenv("PORT", "8000"))
+
+    @property
+    def SHARED_CACHE_DIR(self):
+        return os.getenv("SHARED_CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "gta-cache"
+        )
+
+    @property
+    def PROBLEM_CACHE_TTL_SECONDS(self):
+        return int(os.getenv("PROBLEM_CACHE_TTL_SECONDS", str(60 * 60 * 24)))
+
+    @property
+    def RATE_LIMIT_STORAGE_URI(self):
+        # "memory://" keeps counters per worker; point every worker at a shared
+        # backend (e.g. "redis://...") to enforce limits pod-wide.
+        return os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+    @property
+    def STREAM_FLUSH_CHARS(self):
+        return int(os.getenv("STREAM_FLUSH_CHARS", "256"))
+
+    @property
+    def STREAM_FLUSH_MAX_DELAY_MS(self):
+        # 0 disables coalescing and forwards every model chunk immediately
+        return int(os.getenv("STREAM_FLUSH_MAX_DELAY_MS", "50"))
+
+    @property
+    def ARCHIVE_IDLE_DAYS(self):
+        # Conversations idle this long are compressed; 0 disables the archiver
+        return int(os.getenv("ARCHIVE_IDLE_DAYS", "30"))
+
+    @property
+    def ARCHIVE_INTERVAL_SECONDS(self):
+        return int(os.getenv("ARCHIVE_INTERVAL_SECONDS", str(60 * 60 * 6)))
+
+    @property
+    def BATCH_FETCH_CONCURRENCY(self):
+        return int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+
+    @property
+    def LLM_PROVIDER(self):
+        # "gemini" in production; "fake" streams a canned answer without a key
+        return os.getenv("LLM_PROVIDER", "gemini")
+
+    @property
+    def CHAT_MODEL(self):
+        return os.getenv("CHAT_MODEL", "gemini-2.5-flash-lite")
+
+    @property
+    def CHAT_MODEL_LIGHT(self):
+        # Small talk ("thanks!", "got it") with a short prompt
+        return os.getenv("CHAT_MODEL_LIGHT", "gemini-2.5-flash-lite")
+
+    @property
+    def CHAT_MODEL_DEEP(self):
+        # Code reviews, complexity questions and long pasted solutions
+        return os.getenv("CHAT_MODEL_DEEP", "gemini-2.5-flash")
+
+    @property
+    def CONTEXT_CACHE_TTL_SECONDS(self):
+        return int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+    @property
+    def PREGENERATE_OPENING_TURN(self):
+        return os.getenv("PREGENERATE_OPENING_TURN", "true").lower() == "true"
+
+    @property
+    def PREGENERATE_MAX_BUFFERS(self):
+        return int(os.getenv("PREGENERATE_MAX_BUFFERS", "32"))
+
+    @property
+    def PREGENERATE_TTL_SECONDS(self):
+        return int(os.getenv("PREGENERATE_TTL_SECONDS", "120"))
+
+    @property
+    def RELATED_CORPUS_PATH(self):
+        # Optional JSON object of problem key -> problem data to seed the index
+        return os.getenv("RELATED_CORPUS_PATH") or None
+
+    @property
+    def RELATED_SYNC_SECONDS(self):
+        return int(os.getenv("RELATED_SYNC_SECONDS", "60"))
+
+    @property
+    def HINT_REPEAT_SECONDS(self):
+        # A hint ask this soon after the last hint re-serves it (double clicks)
+        return float(os.getenv("HINT_REPEAT_SECONDS", "10"))
+
+    @property
+    def CODE_ANALYSIS_BUDGET_MS(self):
+        # CPU time the local code analysis may spend per /chat request
+        return float(os.getenv("CODE_ANALYSIS_BUDGET_MS", "20"))
+
+    @property
+    def WARMUP_PRELOAD_PROBLEMS(self):
+        # Hottest problems scraped into the shared cache at startup; 0 disables
+        return int(os.getenv("WARMUP_PRELOAD_PROBLEMS", "20"))
+
+    @property
+    def WARMUP_RETRY_SECONDS(self):
+        return float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
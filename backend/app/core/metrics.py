@@ -0,0 +1,51 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """Process-local counters, rendered in the Prometheus text format.
+
+    Each worker keeps its own counts; the scraper sums them across pods and
+    workers.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelSet, float]] = defaultdict(dict)
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        label_set = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[label_set] = series.get(label_set, 0) + amount
+
+    def value(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for label_set, count in sorted(self._counters[name].items()):
+                    labels = ",".join(f'{key}="{value}"' for key, value in label_set)
+                    series = f"{name}{{{labels}}}" if labels else name
+                    lines.append(f"{series} {count:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
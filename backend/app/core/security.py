@@ -12,6 +12,9 @@ from app.models.schemas import UserInDB
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")  # Updated URL
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/api/v1/auth/token", auto_error=False
+)
 
 
 def verify_password(plain_password, hashed_password):
@@ -59,3 +62,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         hashed_password=user_doc["hashed_password"],
         disabled=user_doc.get("disabled"),
     )
+
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)):
+    """The signed-in user, or ``None`` for anonymous or invalid credentials.
+
+    Used by endpoints that never required auth config, so a pod without a
+    SECRET_KEY treats every caller as anonymous instead of failing.
+    """
+    if not token or not settings.SECRET_KEY:
+        return None
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
@@ -1,6 +1,6 @@
 import logging
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, TEXT, MongoClient
 from pymongo.server_api import ServerApi
 
 from app.core.config import require_mongo_config
@@ -38,3 +38,33 @@ def get_chat_collection():
 
 def get_users_collection():
     return get_db()["users"]
+
+
+def get_code_snapshots_collection():
+    return get_db()["code_snapshots"]
+
+
+def ensure_indexes():
+    chat_collection = get_chat_collection()
+    chat_collection.create_index(
+        [
+            ("user_id", ASCENDING),
+            ("conversation_id", ASCENDING),
+            ("timestamp", ASCENDING),
+        ]
+    )
+    # The user_id prefix keeps every text query scoped to one user's messages,
+    # so search cost grows with that user's history rather than the whole table.
+    chat_collection.create_index(
+        [
+            ("user_id", ASCENDING),
+            ("question", TEXT),
+            ("response", TEXT),
+            ("search_text", TEXT),
+        ],
+        name="chat_text_search_v2",
+        weights={"question": 2, "response": 1, "search_text": 1},
+    )
+    get_code_snapshots_collection().create_index(
+        [("user_id", ASCENDING), ("conversation_id", ASCENDING)], unique=True
+    )
@@ -1,17 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from app.api.v1.auth import router as auth_router
 from app.api.v1.chat import router as chat_router
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.archiver import run_archiver
+from app.services.warmup import run_warmup, warmup_state
 
 # Rate Limiter
-limiter = Limiter(key_func=get_remote_address, default_limits=["60/minute"])
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["60/minute"],
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background; /ready reports when it is done
+    warmup_task = asyncio.create_task(run_warmup(warmup_state))
+    archiver_task = None
+    if settings.ARCHIVE_IDLE_DAYS > 0:
+        archiver_task = asyncio.create_task(run_archiver())
+    yield
+    if archiver_task:
+        archiver_task.cancel()
+    warmup_task.cancel()
+
 
 # FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -22,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Code-Version"],
 )
 
 # Include Routers
@@ -32,3 +59,15 @@ app.include_router(chat_router)
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def readiness_check():
+    """Ready once every worker has finished warm-up; includes the timings."""
+    report = warmup_state.report()
+    return JSONResponse(report, status_code=200 if report["status"] == "ready" else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render()
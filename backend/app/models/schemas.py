@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UserCreate(BaseModel):
@@ -22,8 +22,27 @@ class Token(BaseModel):
     token_type: str
 
 
+class CodeEdit(BaseModel):
+    # Replaces lines [start, end) of the base version (0-based) with `lines`
+    start: int
+    end: int
+    lines: List[str] = []
+
+
 class ChatRequest(BaseModel):
     question: str
     problem_slug: str
     conversation_id: str
     code: Optional[str] = None
+    # Alternative to `code`: edits against the snapshot returned in X-Code-Version
+    code_patch: Optional[List[CodeEdit]] = None
+    base_version: Optional[str] = None
+
+
+class HintRequest(BaseModel):
+    problem_slug: str
+    conversation_id: str
+
+
+class ProblemBatchRequest(BaseModel):
+    identifiers: List[str] = Field(..., min_length=1, max_length=50)
@@ -0,0 +1,18 @@
+import uvicorn
+
+from app.core.config import settings
+
+
+def main():
+    # Workers share problem data through the SharedCache directory, so extra
+    # workers add CPU capacity without each holding its own copy of the cache.
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",  # nosec B104
+        port=settings.PORT,
+        workers=settings.WEB_CONCURRENCY,
+    )
+
+
+if __name__ == "__main__":
+    main()
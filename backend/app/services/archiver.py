@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import socket
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import bson
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.db.database import get_chat_collection, get_db
+
+# Fields that describe the conversation rather than an individual turn.
+CONVERSATION_FIELDS = ("_id", "user_id", "conversation_id", "title", "archived")
+PREVIEW_LENGTH = 200
+LEASE_ID = "chat-archiver"
+
+
+def pack_turns(turns: List[Dict]) -> bytes:
+    return zlib.compress(json.dumps(turns, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def unpack_turns(blob: bytes) -> List[Dict]:
+    return json.loads(zlib.decompress(blob))
+
+
+def search_terms(turns: List[Dict]) -> str:
+    """Distinct words of the turns, for the text index on archived documents.
+
+    The text index ignores word order and repetition, so this keeps archived
+    conversations searchable by term for a fraction of the full text's size.
+    Phrase queries only match live turns.
+    """
+    words = re.findall(
+        r"\w+",
+        " ".join(
+            f"{t.get('question', '')} {t.get('response', '')}" for t in turns
+        ).lower(),
+    )
+    return " ".join(dict.fromkeys(words))
+
+
+def expand_turns(doc: Dict) -> List[Dict]:
+    """Returns the turns stored in a chat document, archived or not."""
+    if doc.get("archived"):
+        return unpack_turns(doc["archive"])
+    return [doc]
+
+
+def archive_conversation(chat_collection, user_id: str, conversation_id: str):
+    """Packs every live turn of a conversation into its archive document.
+
+    Returns ``(bytes_before, bytes_after)`` measured as BSON document sizes.
+    """
+    live = list(
+        chat_collection.find(
+            {
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "archived": {"$ne": True},
+            }
+        ).sort("timestamp", 1)
+    )
+    if not live:
+        return 0, 0
+
+    existing = chat_collection.find_one(
+        {"user_id": user_id, "conversation_id": conversation_id, "archived": True}
+    )
+    bytes_before = sum(len(bson.encode(doc)) for doc in live)
+    turns = []
+    if existing:
+        bytes_before += len(bson.encode(existing))
+        turns = unpack_turns(existing["archive"])
+
+    # A crash between writing the archive and deleting the originals leaves
+    # both behind; skipping turns already archived keeps a rerun idempotent.
+    seen = {(t.get("timestamp"), t.get("question")) for t in turns}
+    for doc in live:
+        turn = {k: v for k, v in doc.items() if k not in CONVERSATION_FIELDS}
+        if (turn.get("timestamp"), turn.get("question")) not in seen:
+            turns.append(turn)
+
+    last = live[-1]
+    archive_doc = {
+        "user_id": user_id,
+        "conversation_id": conversation_id,
+        "archived": True,
+        "problem_slug": last.get("problem_slug"),
+        "timestamp": last.get("timestamp"),
+        # Preview for /conversations, which groups on the newest document
+        "response": last.get("response", "")[:PREVIEW_LENGTH],
+        "turn_count": len(turns),
+        "archive": pack_turns(turns),
+        "search_text": search_terms(turns),
+    }
+    title = last.get("title") or (existing or {}).get("title")
+    if title:
+        archive_doc["title"] = title
+
+    if existing:
+        chat_collection.replace_one({"_id": existing["_id"]}, archive_doc)
+    else:
+        chat_collection.insert_one(archive_doc)
+    chat_collection.delete_many({"_id": {"$in": [doc["_id"] for doc in live]}})
+
+    return bytes_before, len(bson.encode(archive_doc))
+
+
+def archive_idle_conversations(idle_days: int, batch_size: int = 200) -> Dict:
+    """Archives conversations with no new turn in the last ``idle_days`` days."""
+    chat_collection = get_chat_collection()
+    cutoff = (datetime.now() - timedelta(days=idle_days)).isoformat()
+    pipeline = [
+        {"$match": {"archived": {"$ne": True}}},
+        {
+            "$group": {
+                "_id": {"user_id": "$user_id", "conversation_id": "$conversation_id"},
+                "last_turn": {"$max": "$timestamp"},
+            }
+        },
+        {"$match": {"last_turn": {"$lt": cutoff}}},
+        {"$limit": batch_size},
+    ]
+
+    stats = {"conversations": 0, "bytes_before": 0, "bytes_after": 0}
+    for group in chat_collection.aggregate(pipeline):
+        try:
+            before, after = archive_conversation(
+                chat_collection,
+                group["_id"]["user_id"],
+                group["_id"]["conversation_id"],
+            )
+        except Exception as e:
+            logging.error(f"Failed to archive conversation {group['_id']}: {e}")
+            continue
+        stats["conversations"] += 1
+        stats["bytes_before"] += before
+        stats["bytes_after"] += after
+
+    if stats["conversations"]:
+        logging.info(
+            f"Archived {stats['conversations']} conversations: "
+            f"{stats['bytes_before']} -> {stats['bytes_after']} bytes"
+        )
+    return stats
+
+
+def acquire_lease(lease_seconds: int) -> bool:
+    """Ensures only one worker across all pods runs an archiving pass at a time."""
+    now = datetime.now()
+    try:
+        get_db()["job_leases"].update_one(
+            {"_id": LEASE_ID, "expires_at": {"$lt": now}},
+            {
+                "$set": {
+                    "expires_at": now + timedelta(seconds=lease_seconds),
+                    "owner": socket.gethostname(),
+                }
+            },
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def run_archiver():
+    """Background loop started from the app lifespan."""
+    interval = settings.ARCHIVE_INTERVAL_SECONDS
+    while True:
+        try:
+            if await asyncio.to_thread(acquire_lease, interval):
+                await asyncio.to_thread(
+                    archive_idle_conversations, settings.ARCHIVE_IDLE_DAYS
+                )
+        except Exception as e:
+            logging.error(f"Chat archiver pass failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive idle conversations.")
+    parser.add_argument(
+        "--idle-days", type=int, default=settings.ARCHIVE_IDLE_DAYS or 30
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    totals = {"conversations": 0, "bytes_before": 0, "bytes_after": 0}
+    while True:
+        stats = archive_idle_conversations(args.idle_days, args.batch_size)
+        for key in totals:
+            totals[key] += stats[key]
+        if stats["conversations"] < args.batch_size:
+            break
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import ast
+import math
+import re
+import time
+from typing import Dict, List, Optional
+
+# Larger editors are left to the model; parsing them could blow the budget
+MAX_ANALYSIS_CHARS = 10_000
+# Operations a judge typically runs in about a second
+OPS_PER_SECOND = 10**8
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# "1 <= nums.length <= 10^4", "n <= 2 * 10^5", "0 <= s.length <= 5 * 104"
+# (LeetCode's <sup> exponents lose their markup when scraped: 10<sup>4</sup>
+# becomes "104").
+SIZE_BOUND_RE = re.compile(
+    r"(?:length|size|\bn\b|\bm\b)\s*<=\s*"
+    r"(?:(\d+)\s*\*\s*)?(10\s*(?:\^|\*\*)\s*\d+|1e\d+|\d+(?:,\d{3})*)",
+    re.IGNORECASE,
+)
+# Questions about the code failing to run at all; "will this work?" or "is my
+# idea wrong?" are about the approach and go to the tutor.
+CHECK_INTENT_RE = re.compile(
+    r"\b(error|errors|run|runs|running|compile|compiles|syntax|crash|crashes|"
+    r"traceback|exception)\b",
+    re.IGNORECASE,
+)
+# Loops and conditionals look the same in pseudocode ("for each num in nums:"),
+# so only definitions and imports count as evidence of real Python.
+PYTHON_MARKERS_RE = re.compile(
+    r"^\s*(def\s+\w+\s*\(|class\s+\w+|import\s+\w+|from\s+[\w.]+\s+import\b)", re.M
+)
+
+
+def _parse_bound(factor: Optional[str], value: str) -> int:
+    value = value.replace(" ", "").replace(",", "")
+    if "^" in value or "**" in value:
+        bound = 10 ** int(re.split(r"\^|\*\*", value)[1])
+    elif value.lower().startswith("1e"):
+        bound = 10 ** int(value[2:])
+    elif re.fullmatch(r"10[2-9]", value):
+        bound = 10 ** int(value[2])  # scraped 10<sup>k</sup>
+    else:
+        bound = int(value)
+    return bound * int(factor or 1)
+
+
+def input_size_bound(description: str) -> Optional[int]:
+    """Largest input size named in the problem's constraints, if any."""
+    bounds = [
+        _parse_bound(factor, value)
+        for factor, value in SIZE_BOUND_RE.findall(description or "")
+    ]
+    return max(bounds, default=None)
+
+
+class _LoopVisitor(ast.NodeVisitor):
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.depth = 0
+        self.max_depth = 0
+        self.deepest_line: Optional[int] = None
+        self.unbounded_while: List[int] = []
+        self.out_of_time = False
+        self._visited = 0
+
+    def generic_visit(self, node):
+        self._visited += 1
+        if self._visited % 256 == 0 and time.thread_time() > self.deadline:
+            self.out_of_time = True
+        if self.out_of_time:
+            return
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # Loops in a helper are not nested inside the caller's loops
+            outer, self.depth = self.depth, 0
+            super().generic_visit(node)
+            self.depth = outer
+            return
+        if isinstance(node, COMPREHENSIONS):
+            # Each `for` clause is one more level of nesting around the element
+            self._enter(len(node.generators), node.lineno)
+            super().generic_visit(node)
+            self.depth -= len(node.generators)
+            return
+        if not isinstance(node, LOOP_NODES):
+            super().generic_visit(node)
+            return
+
+        if isinstance(node, ast.While) and self._never_exits(node):
+            self.unbounded_while.append(node.lineno)
+        self._enter(1, node.lineno)
+        super().generic_visit(node)
+        self.depth -= 1
+
+    def _enter(self, levels: int, line: int):
+        self.depth += levels
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+            self.deepest_line = line
+
+    @staticmethod
+    def _never_exits(node: ast.While) -> bool:
+        test = node.test
+        if not (isinstance(test, ast.Constant) and test.value):
+            return False
+        for child in ast.walk(node):
+            if isinstance(child, (ast.Break, ast.Return, ast.Raise)):
+                return False
+        return True
+
+
+def analyze_code(
+    code: Optional[str], size_bound: Optional[int], budget_ms: float
+) -> Optional[Dict]:
+    """Cheap structural checks on the student's Python code.
+
+    Returns ``None`` when there is nothing to analyse, including pseudocode
+    that does not parse. Work stops once
+    ``budget_ms`` of CPU time is used; the findings gathered so far are kept
+    and ``complete`` is set to False.
+    """
+    if not code or not code.strip() or len(code) > MAX_ANALYSIS_CHARS:
+        return None
+
+    deadline = time.thread_time() + budget_ms / 1000
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        if not PYTHON_MARKERS_RE.search(code):
+            return None  # pseudocode: its syntax is not worth reporting
+        return {
+            "complete": True,
+            "syntax_error": {
+                "message": e.msg,
+                "line": e.lineno,
+                "column": e.offset,
+                "text": (e.text or "").rstrip("\n"),
+            },
+        }
+    except (ValueError, RecursionError, MemoryError):
+        return None
+
+    visitor = _LoopVisitor(deadline)
+    visitor.visit(tree)
+    findings: Dict = {
+        "complete": not visitor.out_of_time,
+        "max_loop_depth": visitor.max_depth,
+        "deepest_loop_line": visitor.deepest_line,
+        "unbounded_while_lines": visitor.unbounded_while,
+    }
+    if size_bound and visitor.max_depth >= 2:
+        # Kept as a power of ten: size_bound**depth is unbounded for deeply
+        # nested code and would not even format as a float.
+        magnitude = visitor.max_depth * math.log10(size_bound)
+        findings["operations_log10"] = round(magnitude, 1)
+        findings["likely_too_slow"] = magnitude > math.log10(OPS_PER_SECOND)
+    return findings
+
+
+def format_findings(findings: Optional[Dict], size_bound: Optional[int]) -> str:
+    """Compact prompt section summarising ``findings``."""
+    if not findings:
+        return ""
+    lines = []
+    error = findings.get("syntax_error")
+    if error:
+        lines.append(
+            f"- Syntax error at line {error['line']}, column {error['column']}: "
+            f"{error['message']}"
+        )
+    else:
+        depth = findings["max_loop_depth"]
+        if depth:
+            bound = f" with n <= {size_bound:,}" if size_bound else ""
+            lines.append(
+                f"- Deepest loop nesting: {depth} (line {findings['deepest_loop_line']})"
+                f", roughly O(n^{depth}){bound}"
+            )
+        if findings.get("likely_too_slow"):
+            lines.append(
+                f"- About 10^{round(findings['operations_log10'])} operations at the "
+                "largest input: likely Time Limit Exceeded"
+            )
+        for line in findings["unbounded_while_lines"]:
+            lines.append(
+                f"- `while True` at line {line} has no break/return: possible infinite loop"
+            )
+        if not lines:
+            lines.append("- Parses cleanly; no nested loops")
+    if not findings["complete"]:
+        lines.append("- (Analysis stopped early on its time budget)")
+    return "\n**Local Code Analysis:**\n" + "\n".join(lines) + "\n"
+
+
+def syntax_error_reply(
+    question: str, code: Optional[str], findings: Optional[Dict]
+) -> Optional[str]:
+    """Answers "why doesn't this run?" turns whose code does not even parse.
+
+    Only applies to short questions about errors or running the code, on
+    code that is clearly meant to be Python rather than pseudocode.
+    """
+    if not findings or "syntax_error" not in findings:
+        return None
+    if len(question) > 120 or not CHECK_INTENT_RE.search(question):
+        return None
+    if not code or not PYTHON_MARKERS_RE.search(code):
+        return None
+
+    error = findings["syntax_error"]
+    pointer = ""
+    if error["text"] and error["column"]:
+        caret = " " * (error["column"] - 1) + "^"
+        pointer = f"\n```python\n{error['text']}\n{caret}\n```\n"
+    return (
+        f"**Syntax error on line {error['line']}:** {error['message']}.\n{pointer}\n"
+        "Python stops at the first syntax error, so fix this one and run it "
+        "again. Once it runs, tell me what you see and we'll look at your logic."
+    )
@@ -0,0 +1,112 @@
+import difflib
+import hashlib
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.db.database import get_code_snapshots_collection
+from app.models.schemas import ChatRequest, CodeEdit
+
+MAX_DIFF_LINES = 60
+
+
+def code_version(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()[:16]
+
+
+def apply_patch(base: str, edits: List[CodeEdit]) -> str:
+    """Applies line-range replacements, each relative to the original ``base``."""
+    lines = base.split("\n")
+    ordered = sorted(edits, key=lambda e: (e.start, e.end))
+    for edit in ordered:
+        if not 0 <= edit.start <= edit.end <= len(lines):
+            raise ValueError(f"Edit range {edit.start}-{edit.end} is out of bounds")
+    # Overlapping or same-start edits have no single meaning against ``base``
+    for before, after in zip(ordered, ordered[1:]):
+        if after.start < before.end or after.start == before.start:
+            raise ValueError(
+                f"Edit ranges {before.start}-{before.end} and "
+                f"{after.start}-{after.end} overlap"
+            )
+    for edit in reversed(ordered):
+        lines[edit.start : edit.end] = edit.lines
+    return "\n".join(lines)
+
+
+def describe_changes(previous: str, current: str) -> str:
+    """Compact unified diff of the editor between two turns."""
+    diff = list(
+        difflib.unified_diff(
+            previous.split("\n"), current.split("\n"), n=1, lineterm=""
+        )
+    )[2:]  # drop the ---/+++ file headers
+    if len(diff) > MAX_DIFF_LINES:
+        omitted = len(diff) - MAX_DIFF_LINES
+        diff = diff[:MAX_DIFF_LINES] + [f"... ({omitted} more diff lines)"]
+    return "\n".join(diff)
+
+
+def get_snapshot(username: str, conversation_id: str) -> Optional[dict]:
+    return get_code_snapshots_collection().find_one(
+        {"user_id": username, "conversation_id": conversation_id},
+        {"_id": 0, "version": 1, "code": 1},
+    )
+
+
+def save_snapshot(username: str, conversation_id: str, code: str) -> str:
+    version = code_version(code)
+    get_code_snapshots_collection().update_one(
+        {"user_id": username, "conversation_id": conversation_id},
+        {
+            "$set": {
+                "version": version,
+                "code": code,
+                "updated_at": datetime.now().isoformat(),
+            }
+        },
+        upsert=True,
+    )
+    return version
+
+
+def resolve_code(
+    username: str, chat_request: ChatRequest
+) -> Tuple[Optional[str], Optional[str]]:
+    """Works out the editor contents for this turn.
+
+    The client sends either the full ``code`` or a ``code_patch`` against the
+    snapshot identified by ``base_version``. Returns ``(code, previous_code)``
+    where ``previous_code`` is the snapshot from the last turn, if any.
+    """
+    try:
+        snapshot = get_snapshot(username, chat_request.conversation_id)
+    except Exception as e:
+        logging.error(f"MongoDB code snapshot fetch error: {e}")
+        snapshot = None
+    previous = snapshot["code"] if snapshot else None
+
+    if chat_request.code_patch is not None:
+        if not snapshot or snapshot["version"] != chat_request.base_version:
+            # The client must fall back to sending the full code
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "Code base version does not match",
+                    "current_version": snapshot["version"] if snapshot else None,
+                },
+            )
+        try:
+            code = apply_patch(previous, chat_request.code_patch)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        code = chat_request.code
+
+    if code is not None and code != previous:
+        try:
+            save_snapshot(username, chat_request.conversation_id, code)
+        except Exception as e:
+            logging.error(f"MongoDB code snapshot save error: {e}")
+    return code, previous
@@ -0,0 +1,124 @@
+import argparse
+import base64
+import json
+import sys
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.db.database import get_chat_collection
+from app.services.archiver import expand_turns
+
+EXPORT_FIELDS = ("question", "response", "timestamp", "problem_slug")
+BATCH_SIZE = 500
+
+
+def make_cursor(conversation_id: str, timestamp: Optional[str]) -> str:
+    raw = json.dumps([conversation_id, timestamp or ""], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def parse_cursor(after: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Decodes a resume cursor into ``(conversation_id, timestamp)``.
+
+    Cursors name a turn by its conversation and timestamp rather than by
+    document id: archiving rewrites turns into a new document with a new id,
+    but keeps each turn's timestamp, so a resumed download neither repeats
+    nor skips turns archived since it was interrupted.
+    """
+    if not after:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(after + "=" * (-len(after) % 4))
+        conversation_id, timestamp = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid export cursor: {after}")
+    if not isinstance(conversation_id, str) or not isinstance(timestamp, str):
+        raise ValueError(f"Invalid export cursor: {after}")
+    return conversation_id, timestamp
+
+
+def iter_export_records(
+    user_ids: List[str],
+    conversation_ids: Optional[List[str]] = None,
+    after: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Yields one record per turn, by conversation then time, in constant memory."""
+    position = parse_cursor(after)
+    filters: Dict = {"user_id": {"$in": user_ids}}
+    if conversation_ids:
+        filters["conversation_id"] = {"$in": conversation_ids}
+    if position:
+        after_conversation, after_timestamp = position
+        # An archive document is stamped with its newest turn, so one that
+        # straddles the cursor still matches; its older turns are skipped below.
+        filters["$or"] = [
+            {"conversation_id": {"$gt": after_conversation}},
+            {
+                "conversation_id": after_conversation,
+                "timestamp": {"$gte": after_timestamp},
+            },
+        ]
+
+    chat_collection = get_chat_collection()
+    cursor = (
+        chat_collection.find(filters)
+        .sort([("conversation_id", 1), ("timestamp", 1)])
+        .batch_size(BATCH_SIZE)
+    )
+    for doc in cursor:
+        for turn in expand_turns(doc):
+            timestamp = turn.get("timestamp") or ""
+            if (
+                position
+                and doc["conversation_id"] == after_conversation
+                and timestamp <= after_timestamp
+            ):
+                continue
+            record = {
+                "cursor": make_cursor(doc["conversation_id"], timestamp),
+                "user_id": doc["user_id"],
+                "conversation_id": doc["conversation_id"],
+                "title": doc.get("title"),
+            }
+            record.update({field: turn.get(field) for field in EXPORT_FIELDS})
+            yield record
+
+
+def encode_ndjson(records: Iterable[Dict], compress: bool = False) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if compress else None  # gzip framing
+    for record in records:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        if compressor:
+            line = compressor.compress(line)
+            if not line:
+                continue
+        yield line
+    if compressor:
+        yield compressor.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export tutoring sessions for one or more users as NDJSON."
+    )
+    parser.add_argument("--user", action="append", required=True, dest="users")
+    parser.add_argument("--conversation", action="append", dest="conversations")
+    parser.add_argument("--after", help="Resume after this record cursor")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--output", help="File to write (default: stdout)")
+    args = parser.parse_args()
+
+    records = iter_export_records(args.users, args.conversations, args.after)
+    # Appending lets a resumed run continue the same file; concatenated gzip
+    # members still decompress as one stream.
+    out = open(args.output, "ab") if args.output else sys.stdout.buffer
+    try:
+        for chunk in encode_ndjson(records, compress=args.gzip):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
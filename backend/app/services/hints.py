@@ -0,0 +1,91 @@
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.core.config import settings
+from app.db.database import get_chat_collection
+from app.services.archiver import expand_turns
+from app.services.scrapers import clean_text
+
+# Asked on behalf of the student when the hint button is used
+HINT_QUESTION = "Can I get a hint?"
+# Only explicit asks for the next hint, as the whole message. Anything that
+# talks about a hint ("what does hint 2 mean?", "I used the hint but...") is
+# a question of its own for the tutor to answer.
+HINT_REQUEST_RE = re.compile(
+    r"^\W*(please\W+)?"
+    r"((can|could|may)\s+(i|we)\s+(get|have)\s+|(give|show)\s+me\s+|i\s+(need|want)\s+)?"
+    r"((a|another|one\s+more|the\s+next|next|some)\s+)?"
+    r"(hint|clue|nudge)s?(\W+please)?\W*$",
+    re.IGNORECASE,
+)
+
+
+def is_hint_request(question: str) -> bool:
+    return HINT_REQUEST_RE.match(question.strip()) is not None
+
+
+def official_hints(problem_data: Dict) -> List[str]:
+    """The platform's hints as plain text (LeetCode sends them as HTML)."""
+    hints = []
+    for hint in problem_data.get("hints") or []:
+        text = clean_text(BeautifulSoup(hint, "html.parser").get_text())
+        if text:
+            hints.append(text)
+    return hints
+
+
+def last_hint(username: str, conversation_id: str) -> Optional[Dict]:
+    """The highest-level official hint turn of this conversation, if any."""
+    docs = get_chat_collection().find(
+        {
+            "user_id": username,
+            "conversation_id": conversation_id,
+            "$or": [{"hint_level": {"$exists": True}}, {"archived": True}],
+        },
+        {"_id": 0, "hint_level": 1, "timestamp": 1, "archived": 1, "archive": 1},
+    )
+    turns = [
+        turn for doc in docs for turn in expand_turns(doc) if turn.get("hint_level")
+    ]
+    return max(turns, key=lambda turn: turn["hint_level"], default=None)
+
+
+def format_hint(hint: str, level: int, total: int) -> str:
+    follow_up = (
+        "Give it a try, and ask for another hint if you're still stuck."
+        if level < total
+        else "That was the last official hint. Give it a try, and I'm here if you need more help."
+    )
+    return f"**Hint {level} of {total}:** {hint}\n\n{follow_up}"
+
+
+def next_hint(
+    username: str, conversation_id: str, problem_data: Dict
+) -> Optional[Dict]:
+    """The next rung of the official hint ladder, or None once it is used up.
+
+    An ask arriving within HINT_REPEAT_SECONDS of the last hint (a double
+    click, a client retry) gets that hint again with ``repeat`` set, instead
+    of using up the next level; callers do not save a repeat.
+    """
+    hints = official_hints(problem_data)
+    last = last_hint(username, conversation_id)
+    level = last["hint_level"] if last else 0
+    repeat = False
+    if last and last.get("timestamp"):
+        age = datetime.now() - datetime.fromisoformat(last["timestamp"])
+        repeat = age.total_seconds() < settings.HINT_REPEAT_SECONDS
+    if not repeat:
+        level += 1
+    if not 0 < level <= len(hints):
+        return None
+    return {
+        "level": level,
+        "total": len(hints),
+        "hint": hints[level - 1],
+        "response": format_hint(hints[level - 1], level, len(hints)),
+        "repeat": repeat,
+    }
@@ -0,0 +1,298 @@
+import logging
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core import exceptions
+from google.generativeai import caching
+
+from app.core.config import require_gemini_key, settings
+from app.services.shared_cache import SharedCache
+
+# How long to stop retrying after the provider refused to cache a context
+# (e.g. the prefix is below the minimum cacheable size).
+FAILURE_BACKOFF_SECONDS = 600
+# Remote cache handles each worker keeps around; one per hot problem and model
+MAX_HANDLES = 256
+
+
+class ContextCache:
+    """Tracks provider-side caches of the static problem context.
+
+    Entry metadata (remote name and expiry) is kept in a SharedCache so all
+    workers reuse one remote cache per problem. Entries close to expiry are
+    extended when they are next used; expired ones are recreated.
+    """
+
+    namespace = "context-caches"
+
+    def __init__(self, ttl_seconds: int, refresh_margin_seconds: int = 120):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._entries = SharedCache(
+            self.namespace, max_entries=500, max_bytes=1024 * 1024
+        )
+        # One lock per entry: creating or extending a remote cache is a network
+        # call, and turns on other problems must not wait behind it.
+        self._locks: "weakref.WeakValueDictionary[str, threading.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._locks_lock = threading.Lock()
+
+    def _lock_for(self, entry_key: str) -> threading.Lock:
+        with self._locks_lock:
+            lock = self._locks.get(entry_key)
+            if lock is None:
+                lock = self._locks[entry_key] = threading.Lock()
+            return lock
+
+    def lookup(self, key: str, model_name: str, content: str) -> Optional[Any]:
+        """Returns a handle for the cached ``content``, creating it if needed."""
+        entry_key = f"{model_name}:{key}"
+        with self._lock_for(entry_key):
+            now = time.time()
+            entry = self._entries.get(entry_key)
+            if entry and entry.get("failed"):
+                if entry["retry_at"] > now:
+                    return None
+                entry = None
+
+            try:
+                if entry and entry["expires_at"] > now:
+                    if entry["expires_at"] - self.refresh_margin_seconds <= now:
+                        entry["expires_at"] = self._refresh(entry["name"])
+                        self._entries.set(entry_key, entry)
+                    return self._handle(entry["name"])
+
+                if entry:
+                    self._forget(entry["name"])  # expired upstream
+                name, expires_at = self._create(model_name, content)
+                self._entries.set(entry_key, {"name": name, "expires_at": expires_at})
+                return self._handle(name)
+            except Exception as e:
+                logging.warning(f"Context cache unavailable for {entry_key}: {e}")
+                self._entries.set(
+                    entry_key,
+                    {"failed": True, "retry_at": now + FAILURE_BACKOFF_SECONDS},
+                )
+                return None
+
+    def invalidate(self, key: str, model_name: str) -> None:
+        entry_key = f"{model_name}:{key}"
+        entry = self._entries.get(entry_key)
+        if entry and entry.get("name"):
+            self._forget(entry["name"])
+        self._entries.delete(entry_key)
+
+    def _create(self, model_name: str, content: str) -> Tuple[str, float]:
+        raise NotImplementedError
+
+    def _refresh(self, name: str) -> float:
+        raise NotImplementedError
+
+    def _handle(self, name: str) -> Any:
+        raise NotImplementedError
+
+    def _forget(self, name: str) -> None:
+        """Drops any local state kept for the remote cache ``name``."""
+
+
+class GeminiContextCache(ContextCache):
+    def __init__(self, ttl_seconds: int, refresh_margin_seconds: int = 120):
+        super().__init__(ttl_seconds, refresh_margin_seconds)
+        # Remote cache objects already looked up by this worker, least
+        # recently used first
+        self._handles: "OrderedDict[str, caching.CachedContent]" = OrderedDict()
+        self._handles_lock = threading.Lock()
+
+    def _create(self, model_name: str, content: str) -> Tuple[str, float]:
+        cached = caching.CachedContent.create(
+            model=f"models/{model_name}",
+            contents=[content],
+            ttl=timedelta(seconds=self.ttl_seconds),
+        )
+        self._remember(cached)
+        return cached.name, cached.expire_time.timestamp()
+
+    def _refresh(self, name: str) -> float:
+        cached = self._handle(name)
+        cached.update(ttl=timedelta(seconds=self.ttl_seconds))
+        return cached.expire_time.timestamp()
+
+    def _handle(self, name: str) -> caching.CachedContent:
+        with self._handles_lock:
+            cached = self._handles.get(name)
+            if cached is not None:
+                self._handles.move_to_end(name)
+                return cached
+        cached = caching.CachedContent.get(name=name)
+        self._remember(cached)
+        return cached
+
+    def _remember(self, cached: caching.CachedContent) -> None:
+        with self._handles_lock:
+            self._handles[cached.name] = cached
+            self._handles.move_to_end(cached.name)
+            while len(self._handles) > MAX_HANDLES:
+                self._handles.popitem(last=False)
+
+    def _forget(self, name: str) -> None:
+        with self._handles_lock:
+            self._handles.pop(name, None)
+
+
+class LocalContextCache(ContextCache):
+    """In-process stand-in for a provider cache; the handle is the content."""
+
+    def __init__(self, ttl_seconds: int, refresh_margin_seconds: int = 120):
+        # Contents live in this process only, so never share entry metadata
+        self.namespace = f"local-context-caches/{uuid.uuid4().hex}"
+        super().__init__(ttl_seconds, refresh_margin_seconds)
+        self.contents: Dict[str, str] = {}
+        self.created = 0
+        self.refreshed = 0
+
+    def _create(self, model_name: str, content: str) -> Tuple[str, float]:
+        name = f"local/{uuid.uuid4().hex}"
+        self.contents[name] = content
+        self.created += 1
+        return name, time.time() + self.ttl_seconds
+
+    def _refresh(self, name: str) -> float:
+        self.refreshed += 1
+        return time.time() + self.ttl_seconds
+
+    def _handle(self, name: str) -> str:
+        return self.contents[name]
+
+
+class LLMProvider:
+    def __init__(self, context_cache: ContextCache):
+        self.context_cache = context_cache
+
+    def stream(
+        self,
+        context_key: Optional[str],
+        context: str,
+        prompt: str,
+        model_name: str,
+        generation: Optional[Dict] = None,
+    ) -> Iterator[str]:
+        """Streams the answer to ``context`` followed by ``prompt``.
+
+        ``context`` is the static per-problem prefix and ``context_key``
+        identifies it for caching; ``None`` sends it uncached, for prefixes
+        too small to be worth a provider cache. ``generation`` overrides
+        generation settings such as ``max_output_tokens``.
+        """
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    def __init__(self):
+        genai.configure(api_key=require_gemini_key())
+        super().__init__(GeminiContextCache(settings.CONTEXT_CACHE_TTL_SECONDS))
+        self.generation_config = genai.types.GenerationConfig(
+            temperature=0.0,  # Deterministic output
+            candidate_count=1,
+        )
+
+    def stream(
+        self,
+        context_key: Optional[str],
+        context: str,
+        prompt: str,
+        model_name: str,
+        generation: Optional[Dict] = None,
+    ) -> Iterator[str]:
+        cached = None
+        if context_key is not None:
+            cached = self.context_cache.lookup(context_key, model_name, context)
+        generation_config = self.generation_config
+        if generation:
+            generation_config = genai.types.GenerationConfig(
+                temperature=0.0, candidate_count=1, **generation
+            )
+        responses = None
+        if cached is not None:
+            model = genai.GenerativeModel.from_cached_content(
+                cached, generation_config=generation_config
+            )
+            try:
+                responses = model.generate_content(prompt, stream=True)
+            except exceptions.NotFound:
+                # Deleted upstream before our recorded expiry
+                self.context_cache.invalidate(context_key, model_name)
+        if responses is None:
+            model = genai.GenerativeModel(
+                model_name, generation_config=generation_config
+            )
+            responses = model.generate_content(context + prompt, stream=True)
+
+        for chunk in responses:
+            try:
+                if chunk.text:
+                    yield chunk.text
+            except ValueError:
+                pass
+
+
+class FakeProvider(LLMProvider):
+    """Scripted provider for tests and local development without an API key."""
+
+    def __init__(self, chunks: Optional[List[str]] = None, delay: float = 0.0):
+        super().__init__(LocalContextCache(settings.CONTEXT_CACHE_TTL_SECONDS))
+        self.chunks = chunks or ["This is a fake response from the tutor."]
+        self.delay = delay
+        self.requests: List[Dict] = []
+        # Streams started but not yet finished or closed
+        self.active = 0
+
+    def stream(
+        self,
+        context_key: Optional[str],
+        context: str,
+        prompt: str,
+        model_name: str,
+        generation: Optional[Dict] = None,
+    ) -> Iterator[str]:
+        cached = None
+        if context_key is not None:
+            cached = self.context_cache.lookup(context_key, model_name, context)
+        self.requests.append(
+            {
+                "model": model_name,
+                "cached_context": cached,
+                "context": context,
+                "prompt": prompt,
+                "generation": generation or {},
+            }
+        )
+        self.active += 1
+        try:
+            for chunk in self.chunks:
+                if self.delay:
+                    time.sleep(self.delay)
+                yield chunk
+        finally:
+            self.active -= 1
+
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> LLMProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if settings.LLM_PROVIDER == "fake":
+                _provider = FakeProvider()
+            else:
+                _provider = GeminiProvider()
+    return _provider
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.llm import get_provider
+from app.services.prompts import build_problem_context, build_turn_prompt, context_key
+from app.services.shared_cache import SharedCache
+from app.services.streaming import BroadcastStream, iterate_in_thread
+
+# Sent by the frontend's auto-start flow right after a problem is fetched
+OPENING_QUESTION = "I want to solve this problem. Can you guide me?"
+EMPTY_HISTORY = "[]"
+
+
+def turn_key(problem_context: str, turn_prompt: str, model_name: str) -> str:
+    """Identifies a turn whose answer does not depend on who asked it."""
+    digest = hashlib.sha256()
+    for part in (model_name, problem_context, turn_prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+class OpeningTurnBuffer:
+    """Bounded, expiring store of speculatively generated opening turns.
+
+    Each buffered answer is handed to at most one ``/chat`` request, which
+    then persists it like any other turn. Answers still being generated live
+    in this worker only; once finished they move to ``shared`` so a ``/chat``
+    request landing on any worker of the pod can claim them.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl_seconds: int, shared: Optional[SharedCache] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._entries: "OrderedDict[str, Tuple[BroadcastStream, float]]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        self._evict_expired()
+        if key in self._entries:
+            return True
+        return self.shared is not None and self.shared.get(key) is not None
+
+    def put(self, key: str, stream: BroadcastStream):
+        self._evict_expired()
+        while len(self._entries) >= self.max_entries:
+            _, (oldest, _) = self._entries.popitem(last=False)
+            oldest.cancel()
+        self._entries[key] = (stream, time.monotonic() + self.ttl_seconds)
+
+    def claim(self, key: str) -> Optional[BroadcastStream]:
+        self._evict_expired()
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            return None if entry[0].failed else entry[0]
+        if self.shared is not None:
+            text = self.shared.pop(key)
+            if text:
+                return BroadcastStream(_replay(text))
+        return None
+
+    def publish(self, key: str):
+        """Hands a finished, unclaimed answer over to the shared store."""
+        if self.shared is None:
+            return
+        entry = self._entries.get(key)
+        if entry is None or not entry[0].done or entry[0].error is not None:
+            return
+        del self._entries[key]
+        self.shared.set(key, entry[0].text)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (_, expires) in self._entries.items() if expires < now]:
+            stream, _ = self._entries.pop(key)
+            stream.cancel()
+
+
+opening_turns = OpeningTurnBuffer(
+    max_entries=settings.PREGENERATE_MAX_BUFFERS,
+    ttl_seconds=settings.PREGENERATE_TTL_SECONDS,
+    shared=SharedCache(
+        "opening-turns",
+        ttl_seconds=settings.PREGENERATE_TTL_SECONDS,
+        max_entries=settings.PREGENERATE_MAX_BUFFERS,
+        max_bytes=1024 * 1024,
+    ),
+)
+
+
+async def pregenerate_opening_turn(problem_data: Dict):
+    """Starts generating the auto-start turn for a problem in the background."""
+    try:
+        provider = get_provider()
+    except Exception as e:
+        logging.warning(f"Skipping opening turn pre-generation: {e}")
+        return
+
+    model_name = settings.CHAT_MODEL
+    problem_context = build_problem_context(problem_data)
+    turn_prompt = build_turn_prompt(OPENING_QUESTION, EMPTY_HISTORY, None)
+    key = turn_key(problem_context, turn_prompt, model_name)
+    if key in opening_turns:
+        return
+
+    source = iterate_in_thread(
+        provider.stream(
+            context_key(problem_context), problem_context, turn_prompt, model_name
+        )
+    )
+    stream = BroadcastStream(source)
+    opening_turns.put(key, stream)
+    await stream.wait()
+    opening_turns.publish(key)
@@ -0,0 +1,190 @@
+import json
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.shared_cache import SharedCache
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Hashed vocabulary size for description terms. With term frequencies kept
+# as float16, 8192 problems need 4 MiB for them plus 8 MiB for the float32
+# TF-IDF matrix queries run against.
+TEXT_FEATURES = 256
+# Share of the score taken by tag overlap; the rest is description similarity
+TAG_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 2]
+
+
+def term_vector(text: str) -> np.ndarray:
+    """Log-scaled term frequencies, hashed into TEXT_FEATURES buckets."""
+    vector = np.zeros(TEXT_FEATURES, dtype=np.float32)
+    for token in tokenize(text):
+        vector[zlib.crc32(token.encode("utf-8")) % TEXT_FEATURES] += 1.0
+    return np.log1p(vector)
+
+
+class RelatedProblemIndex:
+    """Tag and TF-IDF vectors for every known problem, scored in bulk.
+
+    Rows are appended as problems are fetched and, every ``sync_seconds``,
+    picked up from the shared problem cache so problems fetched by other
+    workers are found too; each sync only decodes cache entries written since
+    the previous one. IDF weights change as rows arrive, so the normalised
+    TF-IDF matrix is rebuilt lazily on the next query.
+    """
+
+    def __init__(
+        self,
+        source: SharedCache,
+        corpus_path: Optional[str] = None,
+        sync_seconds: float = 60,
+    ):
+        self.source = source
+        self.corpus_path = corpus_path
+        self.sync_seconds = sync_seconds
+        self.keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._meta: List[Dict] = []
+        self._tag_columns: Dict[str, int] = {}
+        self._tf = np.zeros((0, TEXT_FEATURES), dtype=np.float16)
+        self._tags = np.zeros((0, 0), dtype=np.float32)
+        self._df = np.zeros(TEXT_FEATURES, dtype=np.float32)
+        self._tfidf: Optional[np.ndarray] = None
+        self._synced_at: Optional[float] = None
+        self._synced_through: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, problem_data: Dict) -> None:
+        self.add_many([(key, problem_data)])
+
+    def add_many(self, problems: Iterable[Tuple[str, Dict]]) -> None:
+        with self._lock:
+            for key, problem_data in problems:
+                if key not in self._rows and isinstance(problem_data, dict):
+                    self._append(key, problem_data)
+
+    def related(self, key: str, k: int = 5) -> List[Dict]:
+        return self.related_batch([key], k)[0]
+
+    def related_batch(self, keys: List[str], k: int = 5) -> List[List[Dict]]:
+        """Top ``k`` neighbours for each of ``keys``, in one matrix product."""
+        self._maybe_sync()
+        with self._lock:
+            n = len(self.keys)
+            rows = np.array([self._rows[key] for key in keys], dtype=np.intp)
+            if n < 2 or not len(rows):
+                return [[] for _ in keys]
+
+            tfidf = self._normalised_tfidf()
+            scores = (1 - TAG_WEIGHT) * (tfidf[rows] @ tfidf.T)
+            tags = self._tags[:n]
+            scores += TAG_WEIGHT * (tags[rows] @ tags.T)
+            scores[np.arange(len(rows)), rows] = -np.inf  # never suggest itself
+
+            k = min(k, n - 1)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for i, candidates in enumerate(top):
+                ordered = candidates[np.argsort(-scores[i, candidates])]
+                results.append(
+                    [
+                        {**self._meta[j], "score": round(float(scores[i, j]), 4)}
+                        for j in ordered
+                    ]
+                )
+            return results
+
+    def _append(self, key: str, problem_data: Dict) -> None:
+        row = len(self.keys)
+        if row == len(self._tf):
+            capacity = max(64, 2 * row)
+            self._tf = self._grow(self._tf, capacity)
+            self._tags = self._grow(self._tags, capacity)
+
+        text = (
+            f"{problem_data.get('title') or ''} {problem_data.get('description') or ''}"
+        )
+        tf = term_vector(text)
+        self._tf[row] = tf
+        self._df += tf > 0
+
+        tags = sorted({tag.lower() for tag in problem_data.get("tags") or []})
+        for tag in tags:
+            column = self._tag_column(tag)
+            self._tags[row, column] = 1.0 / math.sqrt(len(tags))
+
+        self.keys.append(key)
+        self._rows[key] = row
+        self._meta.append(
+            {
+                "key": key,
+                "title": problem_data.get("title"),
+                "difficulty": problem_data.get("difficulty"),
+                "platform": problem_data.get("platform"),
+                "tags": problem_data.get("tags") or [],
+            }
+        )
+        self._tfidf = None
+
+    @staticmethod
+    def _grow(matrix: np.ndarray, rows: int) -> np.ndarray:
+        grown = np.zeros((rows, matrix.shape[1]), dtype=matrix.dtype)
+        grown[: len(matrix)] = matrix
+        return grown
+
+    def _tag_column(self, tag: str) -> int:
+        column = self._tag_columns.get(tag)
+        if column is None:
+            column = self._tag_columns[tag] = len(self._tag_columns)
+            if column == self._tags.shape[1]:
+                extra = max(16, self._tags.shape[1])
+                self._tags = np.pad(self._tags, ((0, 0), (0, extra)))
+        return column
+
+    def _normalised_tfidf(self) -> np.ndarray:
+        if self._tfidf is None:
+            n = len(self.keys)
+            # Built in place to avoid a second n x TEXT_FEATURES temporary
+            tfidf = self._tf[:n].astype(np.float32)
+            tfidf *= np.log((1 + n) / (1 + self._df)) + 1
+            tfidf /= np.maximum(np.linalg.norm(tfidf, axis=1, keepdims=True), 1e-12)
+            self._tfidf = tfidf
+        return self._tfidf
+
+    def _maybe_sync(self) -> None:
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return
+        first_sync = self._synced_at is None
+        self._synced_at = now
+        if first_sync and self.corpus_path:
+            self.add_many(self._load_corpus())
+        started = time.time()
+        try:
+            self.add_many(self.source.items(modified_since=self._synced_through))
+            # A second of overlap covers coarse file timestamps; entries seen
+            # twice are skipped by key.
+            self._synced_through = started - 1
+        except OSError as e:
+            logging.warning(f"Could not sync related problems from cache: {e}")
+
+    def _load_corpus(self) -> List[Tuple[str, Dict]]:
+        """Reads a JSON object mapping problem keys to scraped problem data."""
+        try:
+            with open(self.corpus_path, encoding="utf-8") as f:
+                return list(json.load(f).items())
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Could not load related problem corpus: {e}")
+            return []
@@ -0,0 +1,90 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+metrics.describe("chat_route_total", "Chat turns by model tier and routing reason.")
+metrics.describe(
+    "chat_prompt_chars_total", "Prompt characters sent to the model, by tier."
+)
+
+LIGHT, STANDARD, DEEP = "light", "standard", "deep"
+
+_ACKNOWLEDGEMENT = (
+    r"(thanks?|thank you|thx|ty|ok(ay)?|alright|sure|got it|cool|nice|great|awesome|"
+    r"perfect|makes sense|understood|i see|hi|hello|hey|bye)"
+)
+# Words that can pad an acknowledgement without asking for anything
+_FILLER = r"(so|very|much|a lot|again|you|that|this|it|all|really|clear)"
+SMALL_TALK_RE = re.compile(
+    rf"^\W*{_ACKNOWLEDGEMENT}(\W+({_ACKNOWLEDGEMENT}|{_FILLER}))*\W*$",
+    re.IGNORECASE,
+)
+DEEP_INTENT_RE = re.compile(
+    r"\b(complexity|big[- ]?o|optimi[sz]e|faster|review|prove|proof|edge cases?|"
+    r"debug|why .*(wrong|fail|slow)|tle|time limit)\b",
+    re.IGNORECASE,
+)
+MAX_LIGHT_CHARS = 60
+DEEP_CODE_LINES = 80
+DEEP_QUESTION_CHARS = 400
+LONG_CONVERSATION_TURNS = 5
+
+
+class Route(NamedTuple):
+    tier: str
+    reason: str
+
+
+def _tutor_asked(history: List[Dict]) -> bool:
+    """Whether the last reply ended on a question, making "sure"/"ok" an answer."""
+    if not history:
+        return False
+    return (history[-1].get("response") or "").rstrip(" \n*_)").endswith("?")
+
+
+def classify_turn(
+    question: str,
+    code: Optional[str],
+    history: List[Dict],
+    findings: Optional[Dict] = None,
+) -> Route:
+    """Picks a model tier from cheap, local signals about the turn."""
+    question = question.strip()
+    if (
+        len(question) <= MAX_LIGHT_CHARS
+        and "?" not in question
+        and SMALL_TALK_RE.match(question)
+        and not _tutor_asked(history)
+    ):
+        return Route(LIGHT, "small_talk")
+
+    code_lines = len(code.splitlines()) if code else 0
+    if code_lines >= DEEP_CODE_LINES:
+        return Route(DEEP, "long_code")
+    if code_lines and DEEP_INTENT_RE.search(question):
+        return Route(DEEP, "code_review")
+    if findings and findings.get("likely_too_slow"):
+        return Route(DEEP, "slow_code")
+    if len(history) >= LONG_CONVERSATION_TURNS and len(question) >= DEEP_QUESTION_CHARS:
+        return Route(DEEP, "long_conversation")
+    return Route(STANDARD, "default")
+
+
+def tier_config(tier: str) -> Dict:
+    """Model, prompt variant and generation overrides for ``tier``."""
+    if tier == LIGHT:
+        return {
+            "model": settings.CHAT_MODEL_LIGHT,
+            "prompt": "light",
+            "generation": {"max_output_tokens": 256},
+        }
+    if tier == DEEP:
+        return {"model": settings.CHAT_MODEL_DEEP, "prompt": "full", "generation": {}}
+    return {"model": settings.CHAT_MODEL, "prompt": "full", "generation": {}}
+
+
+def record_route(route: Route, prompt_chars: int) -> None:
+    metrics.increment("chat_route_total", tier=route.tier, reason=route.reason)
+    metrics.increment("chat_prompt_chars_total", prompt_chars, tier=route.tier)
@@ -1,12 +1,37 @@
-from functools import lru_cache
-from typing import Dict
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException
 
+from app.core.config import settings
+
+from .related import RelatedProblemIndex
 from .scrapers import extract_identifier, get_scraper
+from .shared_cache import SharedCache
+
+problem_cache = SharedCache(
+    "problems",
+    ttl_seconds=settings.PROBLEM_CACHE_TTL_SECONDS,
+    max_entries=5000,
+    max_bytes=16 * 1024 * 1024,  # of the 32Mi cache volume
+)
+related_index = RelatedProblemIndex(
+    problem_cache,
+    corpus_path=settings.RELATED_CORPUS_PATH,
+    sync_seconds=settings.RELATED_SYNC_SECONDS,
+)
+
+
+def problem_key(identifier: str) -> Optional[str]:
+    """Canonical cache key, so URLs and bare slugs for one problem collide."""
+    _, platform = get_scraper(identifier)
+    if not platform:
+        return None
+    return f"{platform}:{extract_identifier(identifier, platform)}"
 
 
-@lru_cache(maxsize=100)
 def get_problem_data(identifier: str) -> Dict:
     scraper, platform = get_scraper(identifier)
     if not scraper:
@@ -15,6 +40,12 @@ def get_problem_data(identifier: str) -> Dict:
         )
 
     clean_id = extract_identifier(identifier, platform)
+    cache_key = f"{platform}:{clean_id}"
+    data = problem_cache.get(cache_key)
+    if data is not None:
+        related_index.add(cache_key, data)
+        return data
+
     data = scraper.fetch_problem(clean_id)
 
     if not data:
@@ -22,4 +53,50 @@ def get_problem_data(identifier: str) -> Dict:
             status_code=404, detail=f"No data found for {identifier} on {platform}"
         )
 
+    problem_cache.set(cache_key, data)
+    related_index.add(cache_key, data)
     return data
+
+
+async def stream_problem_batch(
+    identifiers: List[str], concurrency: int
+) -> AsyncIterator[str]:
+    """Resolves problems concurrently, yielding an NDJSON line as each finishes.
+
+    Identifiers naming the same problem are fetched once; at most
+    ``concurrency`` scrapes run at a time.
+    """
+    unique: Dict[str, str] = {}
+    for identifier in identifiers:
+        unique.setdefault(problem_key(identifier) or identifier, identifier)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(identifier: str) -> Dict:
+        async with semaphore:
+            try:
+                data = await asyncio.to_thread(get_problem_data, identifier)
+                return {"identifier": identifier, "status": "ok", "data": data}
+            except HTTPException as e:
+                return {
+                    "identifier": identifier,
+                    "status": "error",
+                    "status_code": e.status_code,
+                    "detail": e.detail,
+                }
+            except Exception as e:
+                logging.error(f"Batch fetch failed for {identifier}: {e}")
+                return {
+                    "identifier": identifier,
+                    "status": "error",
+                    "status_code": 500,
+                    "detail": str(e),
+                }
+
+    tasks = [asyncio.create_task(resolve(identifier)) for identifier in unique.values()]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield json.dumps(await finished) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,101 @@
+import re
+from typing import Dict, Optional
+
+from app.db.database import get_chat_collection
+from app.services.archiver import expand_turns
+
+SNIPPET_LENGTH = 200
+
+
+def make_snippet(text: str, query: str, length: int = SNIPPET_LENGTH) -> str:
+    """Returns a window of ``text`` around the first query term it contains."""
+    if len(text) <= length:
+        return text
+
+    start = 0
+    for term in query.split():
+        match = re.search(re.escape(term.strip('"-')), text, re.IGNORECASE)
+        if match:
+            start = max(0, match.start() - length // 4)
+            break
+
+    snippet = text[start : start + length]
+    if start > 0:
+        snippet = "..." + snippet
+    if start + length < len(text):
+        snippet += "..."
+    return snippet
+
+
+def best_turn(doc: Dict, query: str) -> Dict:
+    """The turn of a (possibly archived) document that best matches ``query``."""
+    turns = expand_turns(doc)
+    terms = [term.strip('"-').lower() for term in query.split()]
+
+    def hits(turn: Dict) -> int:
+        text = f"{turn.get('question', '')} {turn.get('response', '')}".lower()
+        return sum(term in text for term in terms if term)
+
+    return max(reversed(turns), key=hits)
+
+
+def search_history(
+    user_id: str,
+    query: str,
+    problem_slug: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+) -> Dict:
+    """Ranked full-text search over one user's questions and responses.
+
+    Backed by the ``chat_text_search_v2`` index created in ``ensure_indexes``;
+    archived conversations match on their ``search_text`` field.
+    """
+    filters = {"user_id": user_id, "$text": {"$search": query}}
+    if problem_slug:
+        filters["problem_slug"] = problem_slug
+
+    chat_collection = get_chat_collection()
+    total = chat_collection.count_documents(filters)
+    cursor = (
+        chat_collection.find(
+            filters,
+            {
+                "_id": 0,
+                "conversation_id": 1,
+                "problem_slug": 1,
+                "title": 1,
+                "question": 1,
+                "response": 1,
+                "timestamp": 1,
+                "archived": 1,
+                "archive": 1,
+                "score": {"$meta": "textScore"},
+            },
+        )
+        .sort([("score", {"$meta": "textScore"}), ("timestamp", -1)])
+        .skip((page - 1) * page_size)
+        .limit(page_size)
+    )
+
+    results = []
+    for doc in cursor:
+        turn = best_turn(doc, query)
+        results.append(
+            {
+                "conversation_id": doc.get("conversation_id"),
+                "problem_slug": doc.get("problem_slug"),
+                "title": doc.get("title"),
+                "question": turn.get("question", ""),
+                "snippet": make_snippet(turn.get("response", ""), query),
+                "timestamp": turn.get("timestamp", doc.get("timestamp")),
+                "score": doc.get("score"),
+            }
+        )
+    return {
+        "query": query,
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "results": results,
+    }
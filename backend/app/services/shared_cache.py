@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+import uuid
+from typing import Any, Iterator, Optional
+
+from app.core.config import settings
+
+# Every entry file starts with its expiry as a little-endian double, followed by
+# the UTF-8 JSON encoding of [key, value].
+_HEADER = struct.Struct("<d")
+
+
+class SharedCache:
+    """Key/value store shared by all worker processes of a pod.
+
+    Entries are small files under ``SHARED_CACHE_DIR`` (a memory-backed volume
+    in Kubernetes). Workers read them through ``mmap``, so the kernel page
+    cache holds a single copy no matter how many workers serve requests.
+    Writes are atomic renames, which makes concurrent writers safe: the last
+    one wins and readers never see a partial entry.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 1000,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # The Kubernetes volume has a hard size limit, so each namespace gets
+        # a byte budget as well as an entry count.
+        self.max_bytes = max_bytes
+        self._directory = directory
+        self._writes = 0
+
+    @property
+    def directory(self) -> str:
+        base = self._directory or settings.SHARED_CACHE_DIR
+        path = os.path.join(base, self.namespace)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.entry")
+
+    @staticmethod
+    def _read(path: str) -> Optional[tuple[float, str, Any]]:
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size <= _HEADER.size:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    (expires_at,) = _HEADER.unpack_from(mm, 0)
+                    key, value = json.loads(mm[_HEADER.size :])
+                    return expires_at, key, value
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            return None
+
+    @staticmethod
+    def _read_expiry(path: str) -> Optional[float]:
+        """Reads just the header; pruning never needs the JSON payload."""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+        except OSError:
+            return None
+        if len(header) < _HEADER.size:
+            return None
+        return _HEADER.unpack(header)[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        entry = self._read(path)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at and expires_at < time.time():
+            self._remove(path)
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds else 0.0
+        payload = _HEADER.pack(expires_at) + json.dumps([key, value]).encode("utf-8")
+        directory = self.directory
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            self._remove(tmp_path)
+            logging.warning(f"Failed to write shared cache entry {key}: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % 50 == 0:
+            self.prune()
+
+    def pop(self, key: str) -> Optional[Any]:
+        """Removes and returns ``key``'s value.
+
+        The entry is renamed away before it is read, so when several processes
+        race for the same key exactly one of them gets the value.
+        """
+        path = self._path(key)
+        claimed = f"{path}.{uuid.uuid4().hex}.claimed"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return None
+        entry = self._read(claimed)
+        self._remove(claimed)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at and expires_at < time.time():
+            return None
+        return value
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    def items(
+        self, modified_since: Optional[float] = None
+    ) -> Iterator[tuple[str, Any]]:
+        """Yields live ``(key, value)`` pairs in the namespace, in no set order.
+
+        With ``modified_since`` (a ``time.time()`` value) only entries written
+        since then are decoded; every other entry costs a single ``stat``.
+        """
+        now = time.time()
+        for path in self._entry_paths():
+            if modified_since is not None:
+                try:
+                    if os.stat(path).st_mtime < modified_since:
+                        continue
+                except OSError:
+                    continue
+            entry = self._read(path)
+            if entry is None:
+                continue
+            expires_at, key, value = entry
+            if not expires_at or expires_at >= now:
+                yield key, value
+
+    def prune(self) -> None:
+        """Drops expired entries, then the oldest ones beyond the bounds.
+
+        Only file headers and metadata are read, so this stays cheap enough
+        to run inline on the write path.
+        """
+        now = time.time()
+        live = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".entry"):
+                    continue
+                expires_at = self._read_expiry(entry.path)
+                if expires_at is None or (expires_at and expires_at < now):
+                    self._remove(entry.path)
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                live.append((stat.st_mtime, stat.st_size, entry.path))
+
+        live.sort()
+        count = len(live)
+        total = sum(size for _, size, _ in live)
+        for _, size, path in live:
+            over_count = count > self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            self._remove(path)
+            count -= 1
+            total -= size
+
+    def _entry_paths(self) -> Iterator[str]:
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".entry"):
+                    yield entry.path
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,91 @@
+import asyncio
+import hashlib
+from typing import Callable, Dict, Optional
+
+from app.core.metrics import metrics
+from app.services.streaming import BroadcastStream
+
+metrics.describe(
+    "chat_generations_cancelled_total",
+    "Generations stopped because every client listening to them disconnected.",
+)
+
+
+def flight_key(username: str, conversation_id: str, submission: str) -> str:
+    """Identifies one submitted turn of one conversation.
+
+    ``submission`` is the request body as sent, not the prompt built from it:
+    building the prompt reads and updates per-conversation state such as the
+    code snapshot, so a duplicate would otherwise end up with another prompt.
+    """
+    digest = hashlib.sha256()
+    for part in (username, conversation_id, submission):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Flight:
+    def __init__(self, stream: BroadcastStream, headers: Dict[str, str]):
+        self.stream = stream
+        # Response headers of the request that started it, for the ones joining
+        self.headers = headers
+        self.completion: Optional["asyncio.Task[None]"] = None
+        self.listeners = 0
+        self.abandoned = False
+
+
+class SingleFlight:
+    """Generations still streaming, so identical submissions share one.
+
+    A double-click or client retry for the same turn attaches to the running
+    stream instead of starting another, and the turn is persisted once, by
+    ``on_complete``, whichever requests are still listening. Once the last
+    listener disconnects the generation is cancelled.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def join(self, key: str) -> Optional[Flight]:
+        flight = self._flights.get(key)
+        if flight is None or flight.stream.failed or flight.abandoned:
+            return None
+        flight.listeners += 1
+        return flight
+
+    def start(
+        self,
+        key: str,
+        stream: BroadcastStream,
+        on_complete: Callable[[Flight], None],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Flight:
+        flight = Flight(stream, headers or {})
+        flight.listeners = 1
+
+        async def finish():
+            try:
+                await stream.wait()
+            finally:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            on_complete(flight)
+
+        flight.completion = asyncio.create_task(finish())
+        self._flights[key] = flight
+        return flight
+
+    def leave(self, flight: Flight) -> None:
+        """Drops a listener; the last one out cancels an unfinished generation."""
+        flight.listeners -= 1
+        if flight.listeners == 0 and not flight.stream.done:
+            flight.abandoned = True
+            flight.stream.cancel()
+            metrics.increment("chat_generations_cancelled_total")
+
+
+chat_flights = SingleFlight()
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def iterate_in_thread(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """Drives a blocking iterator from a worker thread.
+
+    The Gemini SDK streams with a synchronous iterator; pulling it on the event
+    loop would stall every other request while waiting for the next chunk.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def emit(item) -> bool:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+            return True
+        except RuntimeError:  # event loop already closed
+            return False
+
+    def pump():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if stop.is_set() or not emit(item):
+                    break
+        except Exception as e:
+            emit(e)
+        finally:
+            # Closing a generator runs its cleanup, e.g. releasing the HTTP
+            # stream of an abandoned model response
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            emit(_DONE)
+
+    loop.run_in_executor(None, pump)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def coalesce(
+    chunks: AsyncIterator[str], flush_chars: int, max_delay: float
+) -> AsyncIterator[str]:
+    """Groups small text chunks into larger frames.
+
+    A frame is emitted once it holds at least ``flush_chars`` characters or
+    ``max_delay`` seconds after its first chunk arrived, whichever comes first,
+    so a slow model never leaves text sitting in the buffer. A ``max_delay``
+    of 0 forwards every chunk as-is.
+    """
+    loop = asyncio.get_running_loop()
+    source = chunks.__aiter__()
+    buffer: list[str] = []
+    size = 0
+    deadline = None
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(source.__anext__())
+            if deadline is None:
+                # Nothing buffered yet, so there is no timer to race against.
+                await asyncio.wait({pending})
+                done = True
+            else:
+                timeout = max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+            if done:
+                task, pending = pending, None
+                try:
+                    chunk = task.result()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    if buffer:
+                        yield "".join(buffer)
+                    raise
+                buffer.append(chunk)
+                size += len(chunk)
+                if deadline is None:
+                    deadline = loop.time() + max_delay
+                if size < flush_chars and loop.time() < deadline:
+                    continue
+
+            if buffer:
+                yield "".join(buffer)
+            buffer.clear()
+            size = 0
+            deadline = None
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+class BroadcastStream:
+    """Runs one upstream text stream and replays it to any number of readers.
+
+    The upstream is consumed by a background task into an in-memory list, so
+    a reader that subscribes late still receives the answer from the start.
+    """
+
+    def __init__(self, source: AsyncIterator[str]):
+        self.chunks: List[str] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self._source = source
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._pump())
+        self._task.add_done_callback(self._finished)
+
+    async def _pump(self):
+        async for chunk in self._source:
+            self.chunks.append(chunk)
+            self._notify()
+
+    def _finished(self, task: asyncio.Task):
+        if task.cancelled():
+            self.error = asyncio.CancelledError()
+        elif task.exception() is not None:
+            self.error = task.exception()
+        self.done = True
+        self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def failed(self) -> bool:
+        return self.done and self.error is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return isinstance(self.error, asyncio.CancelledError)
+
+    def cancel(self):
+        self._task.cancel()
+
+    async def wait(self):
+        """Waits until the upstream has finished, successfully or not."""
+        await asyncio.wait({self._task})
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                # A cancelled stream simply ends where it was cut off
+                if self.error is not None and not self.cancelled:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+async def wait_for_disconnect(receive) -> None:
+    """Returns once the ASGI client has gone away."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
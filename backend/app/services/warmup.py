@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+from app.core.config import settings
+from app.db.database import ensure_indexes, get_chat_collection, get_mongo_client
+from app.services.llm import get_provider
+from app.services.scraper_service import stream_problem_batch
+from app.services.shared_cache import SharedCache
+
+# How far back to look when picking the problems students are working on
+HOT_PROBLEM_DAYS = 7
+# Every worker of a pod shares SHARED_CACHE_DIR and keeps a marker there while
+# it is ready; a marker not refreshed for three heartbeats has expired.
+READY_HEARTBEAT_SECONDS = 5
+ready_workers = SharedCache(
+    "ready-workers", ttl_seconds=3 * READY_HEARTBEAT_SECONDS, max_entries=256
+)
+
+
+def count_ready_workers() -> int:
+    return sum(1 for _ in ready_workers.items())
+
+
+class WarmupState:
+    """Progress of the startup warm-up, as reported by ``/ready``.
+
+    Requests are spread over all ``WEB_CONCURRENCY`` workers of the pod, so
+    the pod only reports ready once that many workers have finished warming up.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.total_seconds = None
+        self.steps: Dict[str, Dict] = {}
+
+    def report(self) -> Dict:
+        workers = count_ready_workers()
+        ready = self.ready and workers >= settings.WEB_CONCURRENCY
+        return {
+            "status": "ready" if ready else "warming_up",
+            "workers": {"ready": workers, "expected": settings.WEB_CONCURRENCY},
+            "total_seconds": self.total_seconds,
+            "steps": self.steps,
+        }
+
+    async def run_step(
+        self, name: str, step: Callable[[], Awaitable], required: bool = True
+    ):
+        """Runs ``step``, retrying required ones until they succeed."""
+        entry = self.steps[name] = {"status": "running", "attempts": 0}
+        while True:
+            entry["attempts"] += 1
+            started = time.monotonic()
+            try:
+                result = await step()
+            except Exception as e:
+                entry.update(status="failed", error=str(e))
+                logging.warning(f"Warm-up step {name} failed: {e}")
+                if not required:
+                    return
+                await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+                continue
+            entry.pop("error", None)
+            entry.update(status="ok", seconds=round(time.monotonic() - started, 3))
+            if result is not None:
+                entry["result"] = result
+            return
+
+
+def hot_problem_slugs(limit: int) -> List[str]:
+    """Problems with the most turns over the last HOT_PROBLEM_DAYS days."""
+    since = (datetime.now() - timedelta(days=HOT_PROBLEM_DAYS)).isoformat()
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": since}, "archived": {"$ne": True}}},
+        {"$group": {"_id": "$problem_slug", "turns": {"$sum": 1}}},
+        {"$sort": {"turns": -1}},
+        {"$limit": limit},
+    ]
+    return [
+        doc["_id"] for doc in get_chat_collection().aggregate(pipeline) if doc["_id"]
+    ]
+
+
+async def preload_hot_problems() -> Dict:
+    slugs = await asyncio.to_thread(hot_problem_slugs, settings.WARMUP_PRELOAD_PROBLEMS)
+    loaded = 0
+    async for line in stream_problem_batch(slugs, settings.BATCH_FETCH_CONCURRENCY):
+        loaded += json.loads(line)["status"] == "ok"
+    return {"requested": len(slugs), "loaded": loaded}
+
+
+async def run_warmup(state: WarmupState):
+    """Gets a fresh worker ready before it is sent traffic.
+
+    The database, its indexes and the model client are required: their steps
+    are retried until they succeed. Preloading the hottest problems into the
+    shared cache is best effort. Once done, keeps this worker's readiness
+    marker fresh until cancelled.
+    """
+
+    state.reset()
+
+    def connect():
+        get_mongo_client().admin.command("ping")
+
+    def create_model_client():
+        get_provider()
+
+    await state.run_step("database", lambda: asyncio.to_thread(connect))
+    await state.run_step("indexes", lambda: asyncio.to_thread(ensure_indexes))
+    await state.run_step("model", lambda: asyncio.to_thread(create_model_client))
+    if settings.WARMUP_PRELOAD_PROBLEMS > 0:
+        await state.run_step("problems", preload_hot_problems, required=False)
+
+    state.total_seconds = round(time.monotonic() - state.started_at, 3)
+    state.ready = True
+    logging.info(f"Warm-up finished in {state.total_seconds}s")
+
+    worker = str(os.getpid())
+    try:
+        while True:
+            await asyncio.to_thread(ready_workers.set, worker, state.total_seconds)
+            await asyncio.sleep(READY_HEARTBEAT_SECONDS)
+    finally:
+        ready_workers.delete(worker)
+
+
+warmup_state = WarmupState()
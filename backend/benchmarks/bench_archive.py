@@ -0,0 +1,63 @@
+"""Storage saved and read latency for an archived conversation.
+
+Run from ``backend/``: ``python -m benchmarks.bench_archive``
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import bson
+
+from app.services.archiver import expand_turns, pack_turns, search_terms
+
+TURNS = 40
+WORDS = (
+    "the array hash map pointer window index loop complexity element target "
+    "sum value left right node tree edge case sorted binary search step think "
+    "about what happens when you iterate over each try to store complement"
+).split()
+
+
+def fake_turns(rng: random.Random):
+    start = datetime(2024, 1, 1)
+    for i in range(TURNS):
+        words = rng.choices(WORDS, k=rng.randint(120, 260))
+        yield {
+            "_id": bson.ObjectId(),
+            "user_id": "student",
+            "conversation_id": "conv-1",
+            "problem_slug": "two-sum",
+            "question": " ".join(rng.choices(WORDS, k=12)),
+            "response": "**Hint:** " + " ".join(words),
+            "timestamp": (start + timedelta(minutes=i)).isoformat(),
+        }
+
+
+def main():
+    rng = random.Random(7)
+    live = list(fake_turns(rng))
+    turns = [
+        {k: v for k, v in doc.items() if k not in ("_id", "user_id", "conversation_id")}
+        for doc in live
+    ]
+    archive_doc = {
+        "archived": True,
+        "archive": pack_turns(turns),
+        "search_text": search_terms(turns),
+    }
+
+    before = sum(len(bson.encode(doc)) for doc in live)
+    after = len(bson.encode(archive_doc))
+    print(f"{TURNS} turns: {before} -> {after} bytes ({before / after:.1f}x)")
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        expand_turns(archive_doc)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"decompress + decode per conversation: {elapsed * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares per-chunk forwarding with coalesced framing for one chat stream.
+
+Frames are written to a local socket so each one costs a real ``send`` syscall,
+as it would on the way to the reverse proxy.
+
+Run from ``backend/``: ``python -m benchmarks.bench_streaming``
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+from app.services.streaming import coalesce, iterate_in_thread
+
+CHUNKS = 2000
+CHUNK_TEXT = "token "
+INTER_CHUNK_DELAY = 0.0005
+
+
+def fake_model_stream():
+    for _ in range(CHUNKS):
+        time.sleep(INTER_CHUNK_DELAY)
+        yield CHUNK_TEXT
+
+
+def drain(sock: socket.socket):
+    while sock.recv(65536):
+        pass
+
+
+async def run(flush_chars: int, max_delay_ms: int):
+    writer, reader = socket.socketpair()
+    drainer = threading.Thread(target=drain, args=(reader,))
+    drainer.start()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    transcript = []
+    frames = 0
+    async for frame in coalesce(
+        iterate_in_thread(fake_model_stream()),
+        flush_chars=flush_chars,
+        max_delay=max_delay_ms / 1000,
+    ):
+        transcript.append(frame)
+        writer.sendall(frame.encode("utf-8"))
+        frames += 1
+    text = "".join(transcript)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    writer.close()
+    drainer.join()
+    reader.close()
+    assert len(text) == CHUNKS * len(CHUNK_TEXT)
+    return frames, wall, cpu
+
+
+async def main():
+    print(f"{CHUNKS} chunks of {len(CHUNK_TEXT)} chars")
+    print(
+        f"{'flush_chars':>11} {'max_delay_ms':>12} {'frames':>7} {'frames/s':>9} "
+        f"{'cpu_ms':>7}"
+    )
+    for flush_chars, max_delay_ms in [(0, 0), (64, 20), (256, 50), (1024, 100)]:
+        frames, wall, cpu = await run(flush_chars, max_delay_ms)
+        print(
+            f"{flush_chars:>11} {max_delay_ms:>12} {frames:>7} "
+            f"{frames / wall:>9.0f} {cpu * 1000:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,7 @@
 import os
 import sys
+import tempfile
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock
 
 import pytest
@@ -8,6 +10,9 @@ from fastapi.testclient import TestClient
 # Add app to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Keep the shared problem cache out of the real temp directory
+os.environ["SHARED_CACHE_DIR"] = tempfile.mkdtemp(prefix="gta-test-cache-")
+
 # Mock MongoDB before importing app to avoid connection errors
 import sys
 
@@ -34,16 +39,26 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARED_CACHE_DIR", str(tmp_path / "shared-cache"))
+
+
 @pytest.fixture
-def mock_gemini(mocker):
+def mock_gemini(mocker, monkeypatch):
     """Mocks the Google Generative AI module to avoid real API calls."""
-    mock_genai = mocker.patch("app.api.v1.chat.genai")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-gemini-key")
+    mocker.patch("app.services.llm._provider", None)
+    mock_genai = mocker.patch("app.services.llm.genai")
+    mock_caching = mocker.patch("app.services.llm.caching")
     mock_model = MagicMock()
     mock_genai.GenerativeModel.return_value = mock_model
+    mock_genai.GenerativeModel.from_cached_content.return_value = mock_model
 
-    # Mock streaming response
-    async def mock_stream_response(prompt, stream=True):
-        yield MagicMock(text="This is a mocked response from Gemini.")
+    cached_content = MagicMock()
+    cached_content.name = "cachedContents/test"
+    cached_content.expire_time = datetime.now() + timedelta(hours=1)
+    mock_caching.CachedContent.create.return_value = cached_content
 
     mock_model.generate_content.side_effect = lambda prompt, stream=True: [
         MagicMock(text="This is a mocked response from Gemini.")
@@ -51,6 +66,16 @@ def mock_gemini(mocker):
     return mock_genai
 
 
+@pytest.fixture
+def fake_provider(mocker):
+    """Installs a FakeProvider as the process-wide LLM provider."""
+    from app.services.llm import FakeProvider
+
+    provider = FakeProvider()
+    mocker.patch("app.services.llm._provider", provider)
+    return provider
+
+
 @pytest.fixture
 def mock_mongo(mocker):
     mock_collection = MagicMock()
@@ -45,3 +45,124 @@ def test_chat_flow_mocked(client, mock_gemini, mock_mongo, mock_auth_user, mocke
 
     # Cleanup
     app.dependency_overrides = {}
+
+
+def test_search_scopes_query_to_user(client, mock_auth_user, mocker):
+    mock_collection = mocker.MagicMock()
+    mocker.patch(
+        "app.services.search.get_chat_collection", return_value=mock_collection
+    )
+    mock_collection.count_documents.return_value = 1
+    cursor = mock_collection.find.return_value.sort.return_value.skip.return_value
+    cursor.limit.return_value = [
+        {
+            "conversation_id": "conv-1",
+            "problem_slug": "two-sum",
+            "question": "Why use a hash map?",
+            "response": "A hash map gives O(1) lookups.",
+            "timestamp": "2024-01-01T00:00:00",
+            "score": 1.5,
+        }
+    ]
+
+    from app.core.security import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+
+    response = client.get(
+        "/search", params={"q": "hash map", "problem_slug": "two-sum", "page": 2}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert body["results"][0]["conversation_id"] == "conv-1"
+    filters = mock_collection.find.call_args[0][0]
+    assert filters == {
+        "user_id": "testuser",
+        "$text": {"$search": "hash map"},
+        "problem_slug": "two-sum",
+    }
+    mock_collection.find.return_value.sort.return_value.skip.assert_called_with(20)
+
+    app.dependency_overrides = {}
+
+
+def test_fetch_problems_dedupes_and_streams(client, mocker):
+    import json
+
+    from fastapi import HTTPException
+
+    def fake_get_problem_data(identifier):
+        if identifier == "missing-problem":
+            raise HTTPException(status_code=404, detail="No data found")
+        return {"title": identifier}
+
+    mock_fetch = mocker.patch(
+        "app.services.scraper_service.get_problem_data",
+        side_effect=fake_get_problem_data,
+    )
+
+    response = client.post(
+        "/fetch-problems",
+        json={
+            "identifiers": [
+                "two-sum",
+                "https://leetcode.com/problems/two-sum/",
+                "https://codeforces.com/contest/1/problem/A",
+                "missing-problem",
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = {
+        item["identifier"]: item
+        for item in map(json.loads, response.text.strip().splitlines())
+    }
+    assert set(results) == {
+        "two-sum",
+        "https://codeforces.com/contest/1/problem/A",
+        "missing-problem",
+    }
+    assert results["two-sum"]["status"] == "ok"
+    assert results["missing-problem"]["status_code"] == 404
+    assert mock_fetch.call_count == 3
+
+
+def test_related_problems_endpoint(client, mocker):
+    from app.services.related import RelatedProblemIndex
+    from app.services.shared_cache import SharedCache
+
+    index = RelatedProblemIndex(SharedCache("problems"))
+    index.add("leetcode:3sum", {"title": "3Sum", "tags": ["Array"]})
+    mocker.patch("app.api.v1.chat.related_index", index)
+    mocker.patch(
+        "app.api.v1.chat.get_problem_data",
+        side_effect=lambda _: index.add(
+            "leetcode:two-sum", {"title": "Two Sum", "tags": ["Array"]}
+        ),
+    )
+
+    response = client.get("/related/two-sum?k=3")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["problem"] == "leetcode:two-sum"
+    assert [item["key"] for item in body["related"]] == ["leetcode:3sum"]
+
+
+def test_recent_history_reads_only_the_prompt_window(mock_mongo):
+    from app.api.v1.chat import HISTORY_WINDOW, get_recent_chat_history
+
+    cursor = mock_mongo.find.return_value.sort.return_value
+    cursor.limit.return_value = [
+        {"question": f"q{i}", "response": f"r{i}"} for i in range(5, 0, -1)
+    ]
+
+    history = get_recent_chat_history("testuser", "conv-1")
+
+    assert [turn["question"] for turn in history] == ["q1", "q2", "q3", "q4", "q5"]
+    mock_mongo.find.return_value.sort.assert_called_once_with("timestamp", -1)
+    cursor.limit.assert_called_once_with(HISTORY_WINDOW)
+    assert mock_mongo.find_one.call_count == 0
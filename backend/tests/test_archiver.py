@@ -0,0 +1,105 @@
+from bson import ObjectId
+
+from app.api.v1.chat import get_user_chat_history
+from app.services.archiver import archive_conversation, pack_turns, unpack_turns
+
+
+def _turn(i):
+    return {
+        "_id": ObjectId(),
+        "user_id": "testuser",
+        "conversation_id": "conv-1",
+        "problem_slug": "two-sum",
+        "question": f"Question {i}",
+        "response": f"Think about complements of each element, step {i}. " * 20,
+        "timestamp": f"2024-01-0{i}T00:00:00",
+    }
+
+
+def test_archive_conversation_packs_and_removes_live_turns(mocker):
+    live = [_turn(1), _turn(2)]
+    collection = mocker.MagicMock()
+    collection.find.return_value.sort.return_value = live
+    collection.find_one.return_value = None
+
+    before, after = archive_conversation(collection, "testuser", "conv-1")
+
+    archive_doc = collection.insert_one.call_args[0][0]
+    assert archive_doc["archived"] is True
+    assert archive_doc["turn_count"] == 2
+    assert archive_doc["timestamp"] == "2024-01-02T00:00:00"
+    turns = unpack_turns(archive_doc["archive"])
+    assert [t["question"] for t in turns] == ["Question 1", "Question 2"]
+    collection.delete_many.assert_called_once_with(
+        {"_id": {"$in": [live[0]["_id"], live[1]["_id"]]}}
+    )
+    assert after < before
+
+
+def test_archive_conversation_merges_existing_archive(mocker):
+    first, second = _turn(1), _turn(2)
+    archived_turn = {k: first[k] for k in ("question", "response", "timestamp")}
+    existing = {
+        "_id": ObjectId(),
+        "archived": True,
+        "archive": pack_turns([archived_turn]),
+    }
+    collection = mocker.MagicMock()
+    # The first turn survived a crash after it was archived
+    collection.find.return_value.sort.return_value = [first, second]
+    collection.find_one.return_value = existing
+
+    archive_conversation(collection, "testuser", "conv-1")
+
+    filter_doc, archive_doc = collection.replace_one.call_args[0]
+    assert filter_doc == {"_id": existing["_id"]}
+    turns = unpack_turns(archive_doc["archive"])
+    assert [t["question"] for t in turns] == ["Question 1", "Question 2"]
+
+
+def test_history_expands_archived_turns(mock_mongo):
+    archived = {
+        "archived": True,
+        "archive": pack_turns(
+            [{"question": "q1", "response": "r1", "timestamp": "2024-01-01"}]
+        ),
+    }
+    mock_mongo.find.return_value.sort.return_value = [
+        archived,
+        {"question": "q2", "response": "r2"},
+    ]
+
+    history = get_user_chat_history("testuser", "conv-1")
+
+    assert history == [
+        {"question": "q1", "response": "r1"},
+        {"question": "q2", "response": "r2"},
+    ]
+
+
+def test_search_finds_turns_in_archived_conversations(client, mock_auth_user, mocker):
+    from app.core.security import get_current_user
+    from app.main import app
+
+    live = mocker.MagicMock()
+    live.find.return_value.sort.return_value = [_turn(1), _turn(2)]
+    live.find_one.return_value = None
+    archive_conversation(live, "testuser", "conv-1")
+    archive_doc = live.insert_one.call_args[0][0]
+    assert archive_doc["search_text"].startswith("question 1 think about")
+
+    collection = mocker.MagicMock()
+    mocker.patch("app.services.search.get_chat_collection", return_value=collection)
+    collection.count_documents.return_value = 1
+    cursor = collection.find.return_value.sort.return_value.skip.return_value
+    cursor.limit.return_value = [{**archive_doc, "score": 1.0}]
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    try:
+        response = client.get("/search", params={"q": "step 1"})
+    finally:
+        app.dependency_overrides = {}
+
+    assert "archived" not in collection.find.call_args[0][0]
+    [result] = response.json()["results"]
+    assert result["question"] == "Question 1"
+    assert result["timestamp"] == "2024-01-01T00:00:00"
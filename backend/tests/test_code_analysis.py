@@ -0,0 +1,139 @@
+from app.core.security import get_current_user
+from app.main import app
+from app.services.code_analysis import (
+    analyze_code,
+    format_findings,
+    input_size_bound,
+    syntax_error_reply,
+)
+
+NESTED = """def two_sum(nums, target):
+    for i in range(len(nums)):
+        for j in range(i + 1, len(nums)):
+            if nums[i] + nums[j] == target:
+                return [i, j]
+    while True:
+        pass
+"""
+
+
+def test_input_size_bound_reads_scraped_constraints():
+    description = (
+        "Constraints: 2 <= nums.length <= 104 -109 <= nums[i] <= 109 1 <= n <= 2 * 10^5"
+    )
+    assert input_size_bound(description) == 200_000
+    assert input_size_bound("No constraints listed.") is None
+
+
+def test_analyze_code_estimates_loop_nesting_against_constraints():
+    findings = analyze_code(NESTED, 10**5, budget_ms=50)
+
+    assert findings["complete"]
+    assert findings["max_loop_depth"] == 2
+    assert findings["deepest_loop_line"] == 3
+    assert findings["likely_too_slow"]
+    assert findings["unbounded_while_lines"] == [6]
+    section = format_findings(findings, 10**5)
+    assert "O(n^2) with n <= 100,000" in section
+    assert "likely Time Limit Exceeded" in section
+
+
+def test_analyze_code_counts_comprehensions_and_skips_helpers():
+    code = """def helper(a):
+    for x in a:
+        pass
+
+def solve(grid):
+    for row in grid:
+        helper(row)
+    return [x * y for x in grid for y in grid]
+"""
+    findings = analyze_code(code, 100, budget_ms=50)
+    assert findings["max_loop_depth"] == 2
+    assert findings["deepest_loop_line"] == 8
+    assert not findings["likely_too_slow"]
+
+
+def test_analyze_code_reports_exact_syntax_error_location():
+    findings = analyze_code("def f(nums)\n    return nums\n", None, budget_ms=50)
+    assert findings["syntax_error"]["line"] == 1
+    assert findings["syntax_error"]["column"] == 12
+
+    assert analyze_code("   ", None, budget_ms=50) is None
+
+
+def test_analyze_code_stops_at_cpu_budget():
+    code = "\n".join(f"for i{n} in range(10):\n    x = i{n} * 2" for n in range(200))
+    findings = analyze_code(code, None, budget_ms=0)
+    assert not findings["complete"]
+    assert "time budget" in format_findings(findings, None)
+
+
+def test_syntax_error_reply_only_for_error_questions_on_python():
+    broken = "def f(nums)\n    return nums\n"
+    findings = analyze_code(broken, None, budget_ms=50)
+
+    reply = syntax_error_reply("Why doesn't this run?", broken, findings)
+    assert reply.startswith("**Syntax error on line 1:**")
+    assert "def f(nums)\n           ^" in reply
+    assert syntax_error_reply("Is my approach optimal?", broken, findings) is None
+
+    pseudocode = "loop over nums and keep a map"
+    findings = analyze_code(pseudocode, None, budget_ms=50)
+    assert syntax_error_reply("What's wrong?", pseudocode, findings) is None
+
+    pseudocode = "for each num in nums:\n    if target - num in seen: return pair"
+    findings = analyze_code(pseudocode, None, budget_ms=50)
+    assert findings is None
+    assert format_findings(findings, None) == ""
+    assert syntax_error_reply("Will this work?", pseudocode, findings) is None
+
+    # Questions about the approach are for the tutor, even on broken code
+    for question in (
+        "Will this approach work for negative numbers?",
+        "Is my idea of using two loops wrong?",
+    ):
+        assert (
+            syntax_error_reply(question, broken, analyze_code(broken, None, 50)) is None
+        )
+
+
+def test_analyze_code_handles_absurd_nesting():
+    clauses = " ".join(f"for x{i} in a" for i in range(62))
+    findings = analyze_code(f"b = [0 {clauses}]", 10**5, budget_ms=50)
+
+    assert findings["max_loop_depth"] == 62
+    assert findings["likely_too_slow"]
+    assert "About 10^310 operations" in format_findings(findings, 10**5)
+
+
+def test_chat_answers_syntax_errors_without_the_model(
+    client, fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch(
+        "app.api.v1.chat.get_problem_data",
+        return_value={
+            "title": "Two Sum",
+            "platform": "LeetCode",
+            "difficulty": "Easy",
+            "tags": ["Array"],
+            "description": "2 <= nums.length <= 104",
+        },
+    )
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    payload = {"conversation_id": "conv-1", "problem_slug": "two-sum"}
+
+    try:
+        response = client.post(
+            "/chat",
+            json={**payload, "question": "why the error?", "code": "def f(:\n  pass"},
+        )
+        assert response.text.startswith("**Syntax error on line 1:**")
+        assert fake_provider.requests == []
+
+        client.post("/chat", json={**payload, "question": "Review", "code": NESTED})
+        prompt = fake_provider.requests[0]["prompt"]
+        assert "**Local Code Analysis:**" in prompt
+        assert "roughly O(n^2) with n <= 10,000" in prompt
+    finally:
+        app.dependency_overrides = {}
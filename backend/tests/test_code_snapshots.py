@@ -0,0 +1,105 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models.schemas import ChatRequest, CodeEdit
+from app.services.code_snapshots import (
+    apply_patch,
+    code_version,
+    describe_changes,
+    resolve_code,
+)
+
+BASE = "def two_sum(nums, target):\n    for i in nums:\n        pass"
+
+
+@pytest.fixture
+def snapshots(mocker):
+    collection = mocker.MagicMock()
+    mocker.patch(
+        "app.services.code_snapshots.get_code_snapshots_collection",
+        return_value=collection,
+    )
+    return collection
+
+
+def _request(**kwargs):
+    return ChatRequest(
+        question="Is this right?",
+        problem_slug="two-sum",
+        conversation_id="conv-1",
+        **kwargs,
+    )
+
+
+def test_apply_patch_replaces_line_ranges():
+    edits = [
+        CodeEdit(start=2, end=3, lines=["        seen = {}", "        return []"]),
+        CodeEdit(start=0, end=0, lines=["# attempt 2"]),
+    ]
+    assert apply_patch(BASE, edits) == (
+        "# attempt 2\n"
+        "def two_sum(nums, target):\n"
+        "    for i in nums:\n"
+        "        seen = {}\n"
+        "        return []"
+    )
+
+
+def test_apply_patch_rejects_out_of_range_edit():
+    with pytest.raises(ValueError):
+        apply_patch(BASE, [CodeEdit(start=2, end=9, lines=[])])
+
+
+@pytest.mark.parametrize(
+    "edits",
+    [
+        [CodeEdit(start=0, end=2, lines=["a"]), CodeEdit(start=1, end=3, lines=["b"])],
+        [CodeEdit(start=1, end=1, lines=["a"]), CodeEdit(start=1, end=2, lines=["b"])],
+    ],
+)
+def test_apply_patch_rejects_overlapping_edits(edits):
+    with pytest.raises(ValueError, match="overlap"):
+        apply_patch(BASE, edits)
+
+
+def test_describe_changes_is_compact():
+    current = BASE.replace("pass", "return i")
+    diff = describe_changes(BASE, current)
+    assert "-        pass" in diff
+    assert "+        return i" in diff
+    assert "def two_sum" not in diff
+
+
+def test_resolve_code_applies_patch_to_snapshot(snapshots):
+    snapshots.find_one.return_value = {"version": code_version(BASE), "code": BASE}
+    request = _request(
+        code_patch=[CodeEdit(start=2, end=3, lines=["        return i"])],
+        base_version=code_version(BASE),
+    )
+
+    code, previous = resolve_code("testuser", request)
+
+    assert code.endswith("return i")
+    assert previous == BASE
+    saved = snapshots.update_one.call_args[0][1]["$set"]
+    assert saved["version"] == code_version(code)
+
+
+def test_resolve_code_conflicts_on_stale_base(snapshots):
+    snapshots.find_one.return_value = {"version": code_version(BASE), "code": BASE}
+    request = _request(code_patch=[], base_version="stale")
+
+    with pytest.raises(HTTPException) as exc:
+        resolve_code("testuser", request)
+
+    assert exc.value.status_code == 409
+    assert exc.value.detail["current_version"] == code_version(BASE)
+
+
+def test_resolve_code_skips_save_when_unchanged(snapshots):
+    snapshots.find_one.return_value = {"version": code_version(BASE), "code": BASE}
+
+    code, previous = resolve_code("testuser", _request(code=BASE))
+
+    assert code == previous == BASE
+    snapshots.update_one.assert_not_called()
@@ -0,0 +1,132 @@
+import gzip
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.main import app
+from app.services.archiver import pack_turns
+from app.services.export import (
+    EXPORT_FIELDS,
+    encode_ndjson,
+    iter_export_records,
+    make_cursor,
+    parse_cursor,
+)
+
+ARCHIVE_ID = ObjectId("65a000000000000000000001")
+LIVE_ID = ObjectId("65a000000000000000000002")
+
+
+def _docs():
+    return [
+        {
+            "_id": ARCHIVE_ID,
+            "user_id": "testuser",
+            "conversation_id": "conv-1",
+            "archived": True,
+            "archive": pack_turns(
+                [
+                    {"question": "q1", "response": "r1", "timestamp": "t1"},
+                    {"question": "q2", "response": "r2", "timestamp": "t2"},
+                ]
+            ),
+        },
+        {
+            "_id": LIVE_ID,
+            "user_id": "testuser",
+            "conversation_id": "conv-2",
+            "question": "q3",
+            "response": "r3",
+            "timestamp": "t3",
+        },
+    ]
+
+
+def _mock_collection(mocker, docs):
+    collection = mocker.MagicMock()
+    collection.find.return_value.sort.return_value.batch_size.return_value = docs
+    mocker.patch("app.services.export.get_chat_collection", return_value=collection)
+    return collection
+
+
+def test_export_expands_archives_with_turn_cursors(mocker):
+    _mock_collection(mocker, _docs())
+
+    records = list(iter_export_records(["testuser"]))
+
+    assert [r["question"] for r in records] == ["q1", "q2", "q3"]
+    assert [parse_cursor(r["cursor"]) for r in records] == [
+        ("conv-1", "t1"),
+        ("conv-1", "t2"),
+        ("conv-2", "t3"),
+    ]
+
+
+def test_export_resumes_inside_an_archive(mocker):
+    collection = _mock_collection(mocker, _docs())
+
+    records = list(iter_export_records(["testuser"], after=make_cursor("conv-1", "t1")))
+
+    assert [r["question"] for r in records] == ["q2", "q3"]
+    filters = collection.find.call_args[0][0]
+    assert filters["$or"] == [
+        {"conversation_id": {"$gt": "conv-1"}},
+        {"conversation_id": "conv-1", "timestamp": {"$gte": "t1"}},
+    ]
+
+
+def test_export_resume_survives_archiving(mocker):
+    live = [
+        {
+            "_id": ObjectId(),
+            "user_id": "testuser",
+            "conversation_id": "conv-3",
+            "question": f"q{i}",
+            "response": f"r{i}",
+            "timestamp": f"t{i}",
+        }
+        for i in (1, 2)
+    ]
+    _mock_collection(mocker, live)
+    first = next(iter_export_records(["testuser"]))
+
+    # The conversation is archived into a new document before the resume
+    archived = {
+        "_id": ObjectId(),
+        "user_id": "testuser",
+        "conversation_id": "conv-3",
+        "archived": True,
+        "timestamp": "t2",
+        "archive": pack_turns(
+            [{k: d[k] for k in EXPORT_FIELDS if k in d} for d in live]
+        ),
+    }
+    _mock_collection(mocker, [archived])
+    resumed = list(iter_export_records(["testuser"], after=first["cursor"]))
+
+    assert [r["question"] for r in resumed] == ["q2"]
+
+
+def test_parse_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_cursor("not-a-cursor")
+    assert parse_cursor(None) is None
+
+
+def test_encode_ndjson_gzip_roundtrip():
+    records = [{"question": "q1"}, {"question": "q2"}]
+    payload = b"".join(encode_ndjson(records, compress=True))
+    lines = gzip.decompress(payload).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_export_endpoint_rejects_bad_cursor(client, mock_auth_user):
+    from app.core.security import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+
+    response = client.get("/export", params={"after": "not-a-cursor"})
+
+    assert response.status_code == 400
+    app.dependency_overrides = {}
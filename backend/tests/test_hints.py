@@ -0,0 +1,120 @@
+from app.core.security import get_current_user
+from app.main import app
+from app.services.hints import is_hint_request, official_hints
+
+PROBLEM = {
+    "title": "Two Sum",
+    "platform": "LeetCode",
+    "difficulty": "Easy",
+    "tags": ["Array"],
+    "description": "Find two numbers that add up to target.",
+    "hints": ["Try a <code>brute force</code> first.", "Use a hash map."],
+}
+
+
+def test_is_hint_request():
+    assert is_hint_request("Can I get a hint?")
+    assert is_hint_request("another hint please")
+    assert not is_hint_request("Don't give me a hint, just check my code")
+    assert not is_hint_request("What is the time complexity of my solution?")
+    assert not is_hint_request("hint " + "x" * 100)
+    assert is_hint_request("hint")
+    assert is_hint_request("give me a hint please")
+    for question in (
+        "What does the first hint mean?",
+        "Can you explain hint 2?",
+        "Is the hint about sorting?",
+        "I used the hint but my code fails",
+        "Why is the hint about hashing?",
+    ):
+        assert not is_hint_request(question), question
+
+
+def test_official_hints_strip_html():
+    assert official_hints(PROBLEM) == ["Try a brute force first.", "Use a hash map."]
+
+
+def test_chat_serves_hint_ladder_then_falls_back_to_model(
+    client, fake_provider, mock_mongo, mock_auth_user, mocker, monkeypatch
+):
+    monkeypatch.setenv("HINT_REPEAT_SECONDS", "0")
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    # The hint ladder reads back the turns /chat saved
+    mocker.patch("app.services.hints.get_chat_collection", return_value=mock_mongo)
+    mock_mongo.find.side_effect = lambda *args, **kwargs: [
+        call.args[0] for call in mock_mongo.insert_one.call_args_list
+    ]
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    payload = {
+        "question": "hint?",
+        "conversation_id": "conv-1",
+        "problem_slug": "two-sum",
+    }
+
+    try:
+        first = client.post("/chat", json=payload)
+        second = client.post("/chat", json=payload)
+        assert first.text.startswith("**Hint 1 of 2:** Try a brute force first.")
+        assert second.text.startswith("**Hint 2 of 2:** Use a hash map.")
+        assert fake_provider.requests == []
+
+        # Out of official hints: the tutor answers instead
+        third = client.post("/chat", json=payload)
+        assert third.text == "This is a fake response from the tutor."
+        assert len(fake_provider.requests) == 1
+        levels = [
+            call.args[0].get("hint_level")
+            for call in mock_mongo.insert_one.call_args_list
+        ]
+        assert levels == [1, 2, None]
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_hint_endpoint(client, mock_mongo, mock_auth_user, mocker):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    mocker.patch("app.services.hints.get_chat_collection", return_value=mock_mongo)
+    mock_mongo.find.return_value = [{"hint_level": 2}]
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+
+    try:
+        response = client.post(
+            "/hint", json={"problem_slug": "two-sum", "conversation_id": "conv-1"}
+        )
+        assert response.json() == {"level": None, "total": 2, "hint": None}
+
+        mock_mongo.find.return_value = []
+        response = client.post(
+            "/hint", json={"problem_slug": "two-sum", "conversation_id": "conv-1"}
+        )
+        assert response.json() == {
+            "level": 1,
+            "total": 2,
+            "hint": "Try a brute force first.",
+        }
+        assert mock_mongo.insert_one.call_args[0][0]["hint_level"] == 1
+    finally:
+        app.dependency_overrides = {}
+
+
+def test_double_clicked_hint_does_not_use_up_a_level(
+    client, fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    mocker.patch("app.services.hints.get_chat_collection", return_value=mock_mongo)
+    mock_mongo.find.side_effect = lambda *args, **kwargs: [
+        call.args[0] for call in mock_mongo.insert_one.call_args_list
+    ]
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    payload = {"problem_slug": "two-sum", "conversation_id": "conv-1"}
+
+    try:
+        first = client.post("/hint", json=payload).json()
+        second = client.post("/hint", json=payload).json()
+        third = client.post("/chat", json={**payload, "question": "hint"})
+    finally:
+        app.dependency_overrides = {}
+
+    assert first["level"] == second["level"] == 1
+    assert third.text.startswith("**Hint 1 of 2:**")
+    assert mock_mongo.insert_one.call_count == 1
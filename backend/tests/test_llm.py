@@ -0,0 +1,167 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.main import app
+from app.services.llm import ContextCache, LocalContextCache
+
+PROBLEM = {
+    "title": "Two Sum",
+    "platform": "LeetCode",
+    "difficulty": "Easy",
+    "tags": ["Array", "Hash Table"],
+    "description": "Find two numbers that add up to target.",
+}
+
+
+def test_local_context_cache_reuses_and_refreshes(mocker):
+    cache = LocalContextCache(ttl_seconds=100, refresh_margin_seconds=10)
+    mock_time = mocker.patch("app.services.llm.time.time", return_value=1000.0)
+
+    assert cache.lookup("two-sum", "model", "context") == "context"
+    assert cache.lookup("two-sum", "model", "context") == "context"
+    assert (cache.created, cache.refreshed) == (1, 0)
+
+    # Inside the refresh margin the entry is extended rather than recreated
+    mock_time.return_value = 1095.0
+    assert cache.lookup("two-sum", "model", "context") == "context"
+    assert (cache.created, cache.refreshed) == (1, 1)
+
+    # Once expired a fresh cache is created
+    mock_time.return_value = 1300.0
+    assert cache.lookup("two-sum", "model", "context") == "context"
+    assert cache.created == 2
+
+
+def test_context_cache_backs_off_after_failure(mocker):
+    class RefusingCache(ContextCache):
+        namespace = "refusing-context-caches"
+        attempts = 0
+
+        def _create(self, model_name, content):
+            self.attempts += 1
+            raise ValueError("Cached content is too small")
+
+    cache = RefusingCache(ttl_seconds=100)
+
+    assert cache.lookup("two-sum", "model", "context") is None
+    assert cache.lookup("two-sum", "model", "context") is None
+    assert cache.attempts == 1
+
+
+def test_chat_sends_only_turn_prompt_with_cached_context(
+    client, fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    from app.core.security import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+
+    for question in ("How do I start?", "What about duplicates?"):
+        response = client.post(
+            "/chat",
+            json={
+                "question": question,
+                "conversation_id": "conv-1",
+                "problem_slug": "two-sum",
+            },
+        )
+        assert response.status_code == 200
+
+    assert fake_provider.context_cache.created == 1
+    first, second = fake_provider.requests
+    assert first["cached_context"] == second["cached_context"]
+    assert "Problem Details" in first["cached_context"]
+    assert "Problem Details" not in second["prompt"]
+    assert "What about duplicates?" in second["prompt"]
+
+    app.dependency_overrides = {}
+
+
+def test_context_cache_creation_only_blocks_its_own_problem():
+    started, release = threading.Event(), threading.Event()
+
+    class SlowCache(LocalContextCache):
+        def _create(self, model_name, content):
+            if content == "slow":
+                started.set()
+                release.wait(5)
+            return super()._create(model_name, content)
+
+    cache = SlowCache(ttl_seconds=100)
+    slow = threading.Thread(target=cache.lookup, args=("a", "model", "slow"))
+    slow.start()
+    try:
+        assert started.wait(5)
+        # Another problem is served while the first one's cache is being created
+        assert cache.lookup("b", "model", "fast") == "fast"
+        assert slow.is_alive()
+    finally:
+        release.set()
+        slow.join()
+
+
+def test_gemini_context_cache_handles_are_bounded(mocker):
+    from app.services.llm import GeminiContextCache
+
+    mocker.patch("app.services.llm.MAX_HANDLES", 2)
+    caching = mocker.patch("app.services.llm.caching")
+    handles = [mocker.MagicMock() for _ in range(3)]
+    for i, handle in enumerate(handles):
+        handle.name = f"cachedContents/{i}"
+        handle.expire_time = datetime.now() + timedelta(hours=1)
+    caching.CachedContent.create.side_effect = handles
+    cache = GeminiContextCache(ttl_seconds=3600)
+
+    for i in range(3):
+        cache.lookup(f"p{i}", "model", "context")
+    assert list(cache._handles) == ["cachedContents/1", "cachedContents/2"]
+
+    cache.invalidate("p2", "model")
+    assert list(cache._handles) == ["cachedContents/1"]
+
+
+def test_gemini_provider_uses_cached_content(
+    client, mock_gemini, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    from app.core.security import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+
+    response = client.post(
+        "/chat",
+        json={
+            "question": "How do I start?",
+            "conversation_id": "conv-1",
+            "problem_slug": "two-sum",
+        },
+    )
+
+    assert response.status_code == 200
+    cached_model = mock_gemini.GenerativeModel.from_cached_content.return_value
+    prompt = cached_model.generate_content.call_args[0][0]
+    assert "How do I start?" in prompt
+    assert "Problem Details" not in prompt
+
+    app.dependency_overrides = {}
+
+
+def test_gemini_provider_uncached_context_and_generation_overrides(mock_gemini):
+    from app.services.llm import GeminiProvider, caching
+
+    provider = GeminiProvider()
+    chunks = list(
+        provider.stream(
+            None, "Short context\n", "thanks!", "light-model", {"max_output_tokens": 64}
+        )
+    )
+
+    assert chunks == ["This is a mocked response from Gemini."]
+    caching.CachedContent.create.assert_not_called()
+    mock_gemini.types.GenerationConfig.assert_called_with(
+        temperature=0.0, candidate_count=1, max_output_tokens=64
+    )
+    model_name = mock_gemini.GenerativeModel.call_args[0][0]
+    assert model_name == "light-model"
+    prompt = mock_gemini.GenerativeModel.return_value.generate_content.call_args[0][0]
+    assert prompt == "Short context\nthanks!"
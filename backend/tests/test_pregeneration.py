@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.pregeneration import OPENING_QUESTION, OpeningTurnBuffer
+from app.services.shared_cache import SharedCache
+from app.services.streaming import BroadcastStream
+
+PROBLEM = {
+    "title": "Two Sum",
+    "platform": "LeetCode",
+    "difficulty": "Easy",
+    "tags": ["Array"],
+    "description": "Find two numbers that add up to target.",
+}
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_broadcast_stream_replays_to_late_subscribers():
+    stream = BroadcastStream(_chunks("a", "b", "c"))
+    await stream.wait()
+
+    first = [chunk async for chunk in stream.subscribe()]
+    second = [chunk async for chunk in stream.subscribe()]
+    assert first == second == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_opening_turn_buffer_is_bounded_and_expires(mocker):
+    mock_time = mocker.patch(
+        "app.services.pregeneration.time.monotonic", return_value=100.0
+    )
+    buffer = OpeningTurnBuffer(max_entries=2, ttl_seconds=10)
+    streams = [BroadcastStream(_chunks("x")) for _ in range(3)]
+    for i, stream in enumerate(streams):
+        buffer.put(f"key-{i}", stream)
+
+    assert "key-0" not in buffer
+    assert buffer.claim("key-1") is streams[1]
+    assert buffer.claim("key-1") is None
+
+    mock_time.return_value = 111.0
+    assert buffer.claim("key-2") is None
+    await asyncio.sleep(0)
+
+
+def test_fetch_problem_pregenerates_opening_turn(
+    fake_provider, mock_mongo, mock_auth_user, mocker, monkeypatch
+):
+    monkeypatch.setenv("ARCHIVE_IDLE_DAYS", "0")
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    fake_provider.chunks = ["Let's ", "start ", "with a brute force."]
+    from app.core.security import get_current_user, get_optional_user
+
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    app.dependency_overrides[get_optional_user] = lambda: mock_auth_user
+    payload = {
+        "question": OPENING_QUESTION,
+        "conversation_id": "conv-1",
+        "problem_slug": "two-sum",
+    }
+
+    with TestClient(app) as client:
+        assert client.get("/fetch-problem/two-sum").status_code == 200
+
+        response = client.post("/chat", json=payload)
+        assert response.text == "Let's start with a brute force."
+        # Served from the buffer: no second model call
+        assert len(fake_provider.requests) == 1
+        saved = mock_mongo.insert_one.call_args[0][0]
+        assert saved["response"] == "Let's start with a brute force."
+
+        # The buffer is single-use
+        client.post("/chat", json=payload)
+        assert len(fake_provider.requests) == 2
+
+    app.dependency_overrides = {}
+
+
+def test_fetch_problem_skips_pregeneration_for_anonymous_callers(
+    client, mocker, monkeypatch
+):
+    monkeypatch.setenv("SECRET_KEY", "test-secret-key")
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    pregenerate = mocker.patch("app.api.v1.chat.pregenerate_opening_turn")
+    bad_token = {"Authorization": "Bearer not-a-token"}
+
+    assert client.get("/fetch-problem/two-sum").status_code == 200
+    assert client.get("/fetch-problem/two-sum", headers=bad_token).status_code == 200
+
+    # A pod missing its auth config still serves problems, anonymously
+    monkeypatch.delenv("SECRET_KEY")
+    assert client.get("/fetch-problem/two-sum", headers=bad_token).status_code == 200
+
+    pregenerate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_finished_opening_turn_is_claimable_from_another_worker():
+    worker_a = OpeningTurnBuffer(10, 60, shared=SharedCache("opening-turns"))
+    worker_b = OpeningTurnBuffer(10, 60, shared=SharedCache("opening-turns"))
+    stream = BroadcastStream(_chunks("Start ", "small."))
+    worker_a.put("key", stream)
+    await stream.wait()
+    worker_a.publish("key")
+
+    assert "key" in worker_b
+    claimed = worker_b.claim("key")
+    assert [chunk async for chunk in claimed.subscribe()] == ["Start small."]
+    # Still single-use across workers
+    assert worker_a.claim("key") is None
+    assert "key" not in worker_a
@@ -0,0 +1,111 @@
+import os
+import time
+
+from app.services.related import RelatedProblemIndex
+from app.services.shared_cache import SharedCache
+
+
+def problem(title, tags, description):
+    return {
+        "title": title,
+        "difficulty": "Easy",
+        "tags": tags,
+        "description": description,
+        "platform": "LeetCode",
+    }
+
+
+def test_related_ranks_by_tags_and_description(tmp_path):
+    index = RelatedProblemIndex(SharedCache("problems", directory=str(tmp_path)))
+    index.add(
+        "leetcode:two-sum",
+        problem(
+            "Two Sum", ["Array", "Hash Table"], "Find two numbers adding to target"
+        ),
+    )
+    index.add(
+        "leetcode:three-sum",
+        problem("3Sum", ["Array", "Two Pointers"], "Find triplets adding to zero"),
+    )
+    index.add(
+        "leetcode:four-sum-ii",
+        problem("4Sum II", ["Array", "Hash Table"], "Count tuples adding to zero"),
+    )
+    index.add(
+        "leetcode:word-ladder",
+        problem("Word Ladder", ["Graph", "BFS"], "Shortest transformation sequence"),
+    )
+
+    related = index.related("leetcode:two-sum", k=2)
+
+    assert [item["key"] for item in related] == [
+        "leetcode:four-sum-ii",
+        "leetcode:three-sum",
+    ]
+    assert related[0]["score"] > related[1]["score"] > 0
+    assert index.related("leetcode:word-ladder", k=10)[-1]["score"] == 0
+
+
+def test_related_syncs_problems_cached_by_other_workers(tmp_path):
+    cache = SharedCache("problems", directory=str(tmp_path))
+    index = RelatedProblemIndex(cache, sync_seconds=60)
+    index.add("leetcode:a", problem("A", ["Graph"], "Traverse the graph"))
+    assert index.related("leetcode:a") == []
+
+    # Written by another process; picked up on the next sync
+    cache.set("leetcode:b", problem("B", ["Graph"], "Search the graph"))
+    index._synced_at = time.monotonic() - 61
+
+    assert [item["key"] for item in index.related("leetcode:a")] == ["leetcode:b"]
+    assert len(index) == 2
+
+
+def test_related_batch_over_thousands_of_problems(tmp_path):
+    index = RelatedProblemIndex(SharedCache("problems", directory=str(tmp_path)))
+    topics = ["Array", "Graph", "Dynamic Programming", "String", "Tree", "Math"]
+    index.add_many(
+        (
+            f"leetcode:p{i}",
+            problem(
+                f"Problem {i}",
+                [topics[i % len(topics)], topics[(i * 7) % len(topics)]],
+                f"Solve case {i} using {topics[i % len(topics)]} and word{i % 97}",
+            ),
+        )
+        for i in range(3000)
+    )
+
+    results = index.related_batch(["leetcode:p0", "leetcode:p1"], k=5)
+
+    assert [len(items) for items in results] == [5, 5]
+    assert all("Array" in item["tags"] for item in results[0])
+
+
+def test_related_sync_only_decodes_new_cache_entries(tmp_path, mocker):
+    cache = SharedCache("problems", directory=str(tmp_path))
+    for i in range(5):
+        cache.set(f"leetcode:p{i}", problem(f"P{i}", ["Graph"], "Walk the graph"))
+    index = RelatedProblemIndex(cache, sync_seconds=60)
+    index.related_batch([])
+    assert len(index) == 5
+
+    cache.set("leetcode:new", problem("New", ["Graph"], "Search the graph"))
+    for i in range(5):
+        os.utime(cache._path(f"leetcode:p{i}"), (1000, 1000))
+    read = mocker.spy(SharedCache, "_read")
+    index._synced_at = time.monotonic() - 61
+    index.related_batch([])
+
+    assert len(index) == 6
+    assert read.call_count == 1
+
+
+def test_related_index_memory_stays_small(tmp_path):
+    index = RelatedProblemIndex(SharedCache("problems", directory=str(tmp_path)))
+    index.add_many(
+        (f"leetcode:p{i}", problem(f"P{i}", ["Array"], f"Case {i} of word{i % 97}"))
+        for i in range(8192)
+    )
+    index.related("leetcode:p0")
+
+    assert index._tf.nbytes + index._tfidf.nbytes + index._tags.nbytes < 16 * 2**20
@@ -0,0 +1,93 @@
+from app.core.metrics import metrics
+from app.core.security import get_current_user
+from app.main import app
+from app.services.routing import DEEP, LIGHT, STANDARD, classify_turn, tier_config
+
+PROBLEM = {
+    "title": "Two Sum",
+    "platform": "LeetCode",
+    "difficulty": "Easy",
+    "tags": ["Array"],
+    "description": "Find two numbers that add up to target.",
+}
+
+
+def test_classify_turn():
+    assert classify_turn("thanks!", None, []) == (LIGHT, "small_talk")
+    assert classify_turn("Got it, that makes sense.", "x = 1", []).tier == LIGHT
+    assert classify_turn("Thank you so much!", None, []).tier == LIGHT
+    assert classify_turn("ok but why does my loop fail?", None, []).tier == STANDARD
+    for question in (
+        "ok now explain recursion",
+        "hey explain the approach",
+        "hi what is dp",
+        "thanks, now optimize it",
+    ):
+        assert classify_turn(question, None, []).tier == STANDARD, question
+        assert classify_turn(question, "x = 1", []).tier != LIGHT, question
+    assert classify_turn("How should I start?", None, []) == (STANDARD, "default")
+
+    # Replies to the tutor's own question need the full tier
+    asked = [{"question": "How?", "response": "Use a hash map. Want to go deeper?"}]
+    told = [{"question": "How?", "response": "Use a hash map."}]
+    for reply in ("sure", "ok", "alright", "cool", "ok so"):
+        assert classify_turn(reply, None, asked) == (STANDARD, "default"), reply
+        assert classify_turn(reply, None, told).tier == LIGHT, reply
+    assert (
+        classify_turn("sure", None, [{"response": "**Shall we?**\n"}]).tier == STANDARD
+    )
+
+    long_code = "\n".join(f"x{i} = {i}" for i in range(100))
+    assert classify_turn("Thoughts", long_code, []) == (DEEP, "long_code")
+    assert classify_turn("What is the complexity?", "for x in a: pass", []) == (
+        DEEP,
+        "code_review",
+    )
+    assert classify_turn("What is the complexity?", None, []).tier == STANDARD
+    assert classify_turn("Hmm", "x", [], {"likely_too_slow": True}).tier == DEEP
+    assert classify_turn("a" * 400, None, [{}] * 5) == (DEEP, "long_conversation")
+
+
+def test_tier_config_reads_settings(monkeypatch):
+    monkeypatch.setenv("CHAT_MODEL_LIGHT", "tiny-model")
+    monkeypatch.setenv("CHAT_MODEL_DEEP", "big-model")
+    assert tier_config(LIGHT)["model"] == "tiny-model"
+    assert tier_config(LIGHT)["prompt"] == "light"
+    assert tier_config(DEEP)["model"] == "big-model"
+    assert tier_config(STANDARD)["prompt"] == "full"
+
+
+def test_chat_routes_small_talk_to_light_tier(
+    client, fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    mocker.patch(
+        "app.api.v1.chat.get_recent_chat_history",
+        return_value=[{"question": "How?", "response": "Try a hash map."}],
+    )
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    light_before = metrics.value("chat_route_total", tier=LIGHT, reason="small_talk")
+    payload = {"conversation_id": "conv-1", "problem_slug": "two-sum"}
+
+    try:
+        client.post("/chat", json={**payload, "question": "thanks!"})
+        client.post("/chat", json={**payload, "question": "Where do I begin?"})
+    finally:
+        app.dependency_overrides = {}
+
+    light, standard = fake_provider.requests
+    assert light["model"] == tier_config(LIGHT)["model"]
+    assert light["cached_context"] is None
+    assert light["generation"] == {"max_output_tokens": 256}
+    assert "Try a hash map." in light["prompt"]
+    assert len(light["context"]) + len(light["prompt"]) < 1000
+
+    assert standard["model"] == tier_config(STANDARD)["model"]
+    assert standard["cached_context"] == standard["context"]
+    assert len(standard["context"]) > 5 * len(light["context"])
+
+    assert (
+        metrics.value("chat_route_total", tier=LIGHT, reason="small_talk")
+        == light_before + 1
+    )
+    assert 'chat_prompt_chars_total{tier="light"}' in metrics.render()
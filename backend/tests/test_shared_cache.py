@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from app.services import scraper_service
+from app.services.shared_cache import SharedCache
+
+
+def test_shared_cache_roundtrip(tmp_path):
+    cache = SharedCache("problems", directory=str(tmp_path))
+    assert cache.get("leetcode:two-sum") is None
+
+    cache.set("leetcode:two-sum", {"title": "Two Sum", "tags": ["Array"]})
+    assert cache.get("leetcode:two-sum") == {"title": "Two Sum", "tags": ["Array"]}
+
+    cache.delete("leetcode:two-sum")
+    assert cache.get("leetcode:two-sum") is None
+
+
+def test_shared_cache_expiry(tmp_path, mocker):
+    cache = SharedCache("problems", ttl_seconds=10, directory=str(tmp_path))
+    mock_time = mocker.patch("app.services.shared_cache.time.time")
+    mock_time.return_value = 1000.0
+    cache.set("key", "value")
+
+    mock_time.return_value = 1005.0
+    assert cache.get("key") == "value"
+
+    mock_time.return_value = 1011.0
+    assert cache.get("key") is None
+
+
+def test_shared_cache_prune_keeps_newest(tmp_path):
+    cache = SharedCache("problems", max_entries=2, directory=str(tmp_path))
+    for i in range(4):
+        cache.set(f"key-{i}", i)
+    cache.prune()
+    assert sorted(key for key, _ in cache.items()) == ["key-2", "key-3"]
+
+
+def test_shared_cache_visible_across_processes(tmp_path):
+    script = (
+        "from app.services.shared_cache import SharedCache;"
+        f"SharedCache('problems', directory={str(tmp_path)!r}).set('k', [1, 2])"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=backend_dir)
+
+    assert SharedCache("problems", directory=str(tmp_path)).get("k") == [1, 2]
+
+
+def test_get_problem_data_uses_shared_cache(tmp_path, mocker):
+    mocker.patch.object(
+        scraper_service,
+        "problem_cache",
+        SharedCache("problems", directory=str(tmp_path)),
+    )
+    mock_fetch = mocker.patch(
+        "app.services.scrapers.LeetCodeScraper.fetch_problem",
+        return_value={"title": "Two Sum", "platform": "LeetCode"},
+    )
+
+    first = scraper_service.get_problem_data("two-sum")
+    second = scraper_service.get_problem_data(
+        "https://leetcode.com/problems/two-sum/description/"
+    )
+
+    assert first == second == {"title": "Two Sum", "platform": "LeetCode"}
+    mock_fetch.assert_called_once_with("two-sum")
+
+
+def test_shared_cache_prune_enforces_byte_budget(tmp_path, mocker):
+    cache = SharedCache("problems", directory=str(tmp_path), max_bytes=3000)
+    for i in range(5):
+        cache.set(f"key-{i}", "x" * 900)
+        os.utime(cache._path(f"key-{i}"), (1000 + i, 1000 + i))
+
+    # Pruning only needs the 8-byte header, never the JSON payload
+    loads = mocker.patch("app.services.shared_cache.json.loads")
+    cache.prune()
+    loads.assert_not_called()
+    mocker.stopall()
+
+    assert sorted(key for key, _ in cache.items()) == ["key-2", "key-3", "key-4"]
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.metrics import metrics
+from app.core.security import get_current_user
+from app.main import app
+from app.services.single_flight import chat_flights
+
+PROBLEM = {
+    "title": "Two Sum",
+    "platform": "LeetCode",
+    "difficulty": "Easy",
+    "tags": ["Array"],
+    "description": "Find two numbers that add up to target.",
+}
+
+
+@pytest.mark.asyncio
+async def test_identical_submissions_share_one_generation(
+    fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    mock_mongo.find.return_value.sort.return_value.limit.return_value = []
+    fake_provider.chunks = ["Think ", "about ", "hashing."]
+    fake_provider.delay = 0.05
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    payload = {
+        "question": "How do I start?",
+        "conversation_id": "conv-1",
+        "problem_slug": "two-sum",
+        "code": "def two_sum(nums, target):",
+    }
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            first, second = await asyncio.gather(
+                c.post("/chat", json=payload), c.post("/chat", json=payload)
+            )
+            assert first.text == second.text == "Think about hashing."
+            assert len(fake_provider.requests) == 1
+            assert mock_mongo.insert_one.call_count == 1
+            assert len(chat_flights) == 0
+
+            # A different turn is generated separately
+            await c.post("/chat", json={**payload, "question": "Why hashing?"})
+            assert len(fake_provider.requests) == 2
+    finally:
+        app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_coalesces_after_snapshot_is_saved(
+    fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    # A real store: the first request saves the snapshot before the second
+    # one resolves its code, so the second one sees the code as unchanged.
+    saved = {}
+    snapshots = mocker.MagicMock()
+    snapshots.find_one.side_effect = lambda filters, projection: saved.get(
+        (filters["user_id"], filters["conversation_id"])
+    )
+    snapshots.update_one.side_effect = lambda filters, update, upsert: saved.update(
+        {(filters["user_id"], filters["conversation_id"]): dict(update["$set"])}
+    )
+    mocker.patch(
+        "app.services.code_snapshots.get_code_snapshots_collection",
+        return_value=snapshots,
+    )
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    mock_mongo.find.return_value.sort.return_value.limit.return_value = []
+    fake_provider.chunks = ["Use ", "a set."]
+    fake_provider.delay = 0.05
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    payload = {
+        "question": "Is this right?",
+        "conversation_id": "conv-1",
+        "problem_slug": "two-sum",
+        "code": "def two_sum(nums, target):\n    return []",
+    }
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            first, second = await asyncio.gather(
+                c.post("/chat", json=payload), c.post("/chat", json=payload)
+            )
+    finally:
+        app.dependency_overrides = {}
+
+    assert first.text == second.text == "Use a set."
+    assert first.headers["X-Code-Version"] == second.headers["X-Code-Version"]
+    assert len(fake_provider.requests) == 1
+    assert mock_mongo.insert_one.call_count == 1
+    assert snapshots.update_one.call_count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+async def test_disconnect_cancels_generation_and_keeps_partial_answer(
+    spec_version, fake_provider, mock_mongo, mock_auth_user, mocker
+):
+    mocker.patch("app.api.v1.chat.get_problem_data", return_value=PROBLEM)
+    # Would take four seconds to finish if nobody stopped it
+    fake_provider.chunks = [f"step {i}. " for i in range(200)]
+    fake_provider.delay = 0.02
+    app.dependency_overrides[get_current_user] = lambda: mock_auth_user
+    cancelled_before = metrics.value("chat_generations_cancelled_total")
+
+    body = json.dumps(
+        {"question": "Explain", "conversation_id": "conv-1", "problem_slug": "two-sum"}
+    ).encode()
+    disconnected = asyncio.Event()
+    received = []
+
+    async def receive():
+        if not received:
+            received.append(body)
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # The tab closes as soon as the first words arrive
+        if message["type"] == "http.response.body" and message.get("body"):
+            disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chat",
+        "raw_path": b"/chat",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+
+    try:
+        await asyncio.wait_for(app(scope, receive, send), timeout=2)
+        stopped_after = time.monotonic()
+        await disconnected.wait()
+        while fake_provider.active or not mock_mongo.insert_one.called:
+            assert time.monotonic() - stopped_after < 0.5
+            await asyncio.sleep(0.01)
+    finally:
+        app.dependency_overrides = {}
+
+    saved = mock_mongo.insert_one.call_args[0][0]
+    assert saved["truncated"] is True
+    assert saved["response"].startswith("step 0. ")
+    assert len(saved["response"]) < len("".join(fake_provider.chunks))
+    assert metrics.value("chat_generations_cancelled_total") == cancelled_before + 1
+    assert len(chat_flights) == 0
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app.services.streaming import coalesce, iterate_in_thread
+
+
+async def _source(chunks, delay=0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def _collect(frames):
+    return [frame async for frame in frames]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_groups_chunks_by_size():
+    frames = await _collect(
+        coalesce(_source(["ab", "cd", "ef", "g"]), flush_chars=4, max_delay=10)
+    )
+    assert frames == ["abcd", "efg"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_after_max_delay():
+    frames = await _collect(
+        coalesce(_source(["a", "b", "c"], delay=0.05), flush_chars=1000, max_delay=0.01)
+    )
+    assert frames == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_zero_delay_passes_chunks_through():
+    frames = await _collect(
+        coalesce(_source(["a", "b", "c"]), flush_chars=1000, max_delay=0)
+    )
+    assert frames == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_thread_flushes_buffer_before_error():
+    def upstream():
+        yield "partial "
+        raise RuntimeError("quota exceeded")
+
+    frames = []
+    with pytest.raises(RuntimeError, match="quota"):
+        async for frame in coalesce(
+            iterate_in_thread(upstream()), flush_chars=1000, max_delay=10
+        ):
+            frames.append(frame)
+    assert frames == ["partial "]
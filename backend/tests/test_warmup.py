@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.warmup import WarmupState, preload_hot_problems, ready_workers
+
+
+def test_ready_reports_warmup_timings(fake_provider, mocker, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_IDLE_DAYS", "0")
+    monkeypatch.setenv("MONGO_URI", "mongodb://localhost:27017")
+    monkeypatch.setenv("MONGODB_DB_NAME", "testdb")
+    mocker.patch(
+        "app.services.warmup.hot_problem_slugs", return_value=["two-sum", "3sum"]
+    )
+    mocker.patch(
+        "app.services.scraper_service.get_problem_data",
+        side_effect=lambda slug: {"title": slug},
+    )
+
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 2
+        response = client.get("/ready")
+        while response.status_code == 503 and time.monotonic() < deadline:
+            assert response.json()["status"] == "warming_up"
+            time.sleep(0.01)
+            response = client.get("/ready")
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready"
+    assert report["workers"] == {"ready": 1, "expected": 1}
+    assert report["total_seconds"] is not None
+    assert list(report["steps"]) == ["database", "indexes", "model", "problems"]
+    assert all(step["status"] == "ok" for step in report["steps"].values())
+    assert all("seconds" in step for step in report["steps"].values())
+    assert report["steps"]["problems"]["result"] == {"requested": 2, "loaded": 2}
+
+
+def test_ready_waits_for_every_worker(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    state = WarmupState()
+    state.ready = True
+    ready_workers.set("101", 1.0)
+
+    report = state.report()
+    assert report["status"] == "warming_up"
+    assert report["workers"] == {"ready": 1, "expected": 2}
+
+    # The other worker of the pod finishes its warm-up
+    ready_workers.set("102", 1.5)
+    assert state.report()["status"] == "ready"
+
+    state.ready = False
+    assert state.report()["status"] == "warming_up"
+
+
+@pytest.mark.asyncio
+async def test_required_steps_retry_until_they_succeed(monkeypatch):
+    monkeypatch.setenv("WARMUP_RETRY_SECONDS", "0")
+    state = WarmupState()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("database unreachable")
+
+    async def broken():
+        raise RuntimeError("scraper down")
+
+    await state.run_step("database", flaky)
+    await state.run_step("problems", broken, required=False)
+
+    assert state.steps["database"]["status"] == "ok"
+    assert state.steps["database"]["attempts"] == 3
+    assert "error" not in state.steps["database"]
+    assert state.steps["problems"] == {
+        "status": "failed",
+        "attempts": 1,
+        "error": "scraper down",
+    }
+
+
+@pytest.mark.asyncio
+async def test_preload_counts_failed_problems(mocker):
+    from fastapi import HTTPException
+
+    def fetch(slug):
+        if slug == "gone":
+            raise HTTPException(status_code=404, detail="No data found")
+        return {"title": slug}
+
+    mocker.patch("app.services.warmup.hot_problem_slugs", return_value=["a", "gone"])
+    mocker.patch("app.services.scraper_service.get_problem_data", side_effect=fetch)
+
+    assert await preload_hot_problems() == {"requested": 2, "loaded": 1}
+    await asyncio.sleep(0)
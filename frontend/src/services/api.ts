@@ -48,11 +48,19 @@ export interface ProblemSummary {
   examples: string[];
 }
 
+export interface CodeEdit {
+  start: number;
+  end: number;
+  lines: string[];
+}
+
 export interface ChatRequest {
   question: string;
   problem_slug: string;
   conversation_id: string;
   code?: string;
+  code_patch?: CodeEdit[];
+  base_version?: string;
 }
 
 export interface ChatResponse {
@@ -122,6 +130,41 @@ export async function chatWithAI(requestData: ChatRequest): Promise<ChatResponse
   return response.data;
 }
 
+// Last editor snapshot the server acknowledged (X-Code-Version), per conversation
+const codeSnapshots = new Map<string, { version: string; code: string }>();
+
+// Single line-range edit covering everything between the common prefix and suffix
+function diffCode(base: string, code: string): CodeEdit {
+  const before = base.split("\n");
+  const after = code.split("\n");
+  let prefix = 0;
+  while (prefix < before.length && prefix < after.length && before[prefix] === after[prefix]) {
+    prefix++;
+  }
+  let suffix = 0;
+  while (
+    suffix < before.length - prefix &&
+    suffix < after.length - prefix &&
+    before[before.length - 1 - suffix] === after[after.length - 1 - suffix]
+  ) {
+    suffix++;
+  }
+  return {
+    start: prefix,
+    end: before.length - suffix,
+    lines: after.slice(prefix, after.length - suffix),
+  };
+}
+
+function encodeCode(requestData: ChatRequest): ChatRequest {
+  const snapshot = codeSnapshots.get(requestData.conversation_id);
+  const code = requestData.code;
+  if (code === undefined || !snapshot) return requestData;
+  const patched: ChatRequest = { ...requestData, code_patch: [diffCode(snapshot.code, code)], base_version: snapshot.version };
+  delete patched.code;
+  return patched;
+}
+
 export async function streamChatWithAI(
   requestData: ChatRequest,
   onChunk: (chunk: string) => void,
@@ -130,21 +173,33 @@ export async function streamChatWithAI(
 ): Promise<void> {
   try {
     const token = localStorage.getItem("token");
-    const response = await fetch(`${API_BASE_URL}/chat`, {
+    const send = (body: ChatRequest) => fetch(`${API_BASE_URL}/chat`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
         ...(token ? { "Authorization": `Bearer ${token}` } : {})
       },
-      body: JSON.stringify(requestData),
+      body: JSON.stringify(body),
     });
 
+    let response = await send(encodeCode(requestData));
+    if (response.status === 409) {
+      // Server snapshot moved on (or expired): resend the full code
+      codeSnapshots.delete(requestData.conversation_id);
+      response = await send(requestData);
+    }
+
     if (!response.ok) {
       // Handle non-200, try to parse error
       const errText = await response.text();
       throw new Error(`API Error ${response.status}: ${errText}`);
     }
 
+    const codeVersion = response.headers.get("X-Code-Version");
+    if (codeVersion && requestData.code !== undefined) {
+      codeSnapshots.set(requestData.conversation_id, { version: codeVersion, code: requestData.code });
+    }
+
     const reader = response.body?.getReader();
     const decoder = new TextDecoder();
 